@@ -40,6 +40,13 @@ class Settings(BaseSettings):
     gemini_retry_delay: float = 1.0  # Exponential backoff initial delay (seconds)
     gemini_temperature: float = 0.1  # Low temperature for OCR accuracy
     gemini_timeout: float = 120.0  # API request timeout (seconds)
+    gemini_max_image_side: int = 1024  # Downscale longer side before upload (0 = off)
+    gemini_max_concurrency: int = 4  # Max in-flight OCR API requests per process
+    gemini_max_rps: float = 0.0  # Max OCR API requests started per second (0 = unlimited)
+
+    # OCR preprocessing (deskew + CLAHE on a temp copy of each page)
+    preprocess_enabled: bool = True  # False = send the original image to OCR
+    preprocess_skip_straight: bool = False  # Send pages needing no deskew as-is (no CLAHE)
 
     model_config = {
         "env_file": ".env",
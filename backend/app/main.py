@@ -10,6 +10,7 @@ from fastapi.responses import JSONResponse
 from app.config import get_settings
 from app.database import init_db
 from app.routers import images, processing, providers, tasks
+from app.services.ocr_service import close_all_clients
 
 logger = logging.getLogger("handwrite_diff")
 
@@ -25,6 +26,7 @@ async def lifespan(app: FastAPI):
     logger.info("Started %s", settings.app_name)
     yield
     logger.info("Shutting down %s", settings.app_name)
+    await close_all_clients()
 
 
 app = FastAPI(
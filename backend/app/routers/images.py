@@ -62,7 +62,8 @@ async def upload_images(
         save_path = settings.upload_dir / unique_name
 
         content = await file.read()
-        save_path.write_bytes(content)
+        # Off the event loop: a multi-MB photo write would stall other requests
+        await asyncio.to_thread(save_path.write_bytes, content)
 
         record = ImageRecord(
             task_id=task_id,
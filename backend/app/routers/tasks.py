@@ -4,6 +4,7 @@ import io
 import json
 import re
 import zipfile
+from collections import Counter
 from pathlib import Path
 
 from fastapi import APIRouter, BackgroundTasks, HTTPException
@@ -235,19 +236,19 @@ async def get_task_stats(task_id: int, db: DB) -> dict:
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
+    # Only the diff column is needed; skip loading the OCR text/word JSON
     result = await db.execute(
-        select(ImageRecord)
+        select(ImageRecord.diff_result_json)
         .where(ImageRecord.task_id == task_id)
         .where(ImageRecord.diff_result_json.isnot(None))
     )
-    records = list(result.scalars().all())
 
-    counts: dict[str, int] = {"correct": 0, "wrong": 0, "missing": 0, "extra": 0}
-    for rec in records:
-        for op in json.loads(rec.diff_result_json):
-            dt = op.get("diff_type", "")
-            if dt in counts:
-                counts[dt] += 1
+    tally = Counter(
+        op.get("diff_type")
+        for diff_json in result.scalars()
+        for op in json.loads(diff_json)
+    )
+    counts = {dt: tally[dt] for dt in ("correct", "wrong", "missing", "extra")}
 
     total = sum(counts.values())
     accuracy = round(counts["correct"] / total * 100, 1) if total > 0 else 0.0
@@ -193,18 +193,27 @@ def _resolve_label_overlaps(label_rects: list[LabelRect]) -> dict[int, int]:
     sorted_rects = sorted(label_rects, key=lambda r: (r.y, r.x))
     offsets: dict[int, int] = {r.op_index: 0 for r in sorted_rects}
 
+    # Shifts are vertical only, so rects whose x-intervals are disjoint can
+    # never overlap.  Find the x-overlapping pairs once, in (i, j) order.
+    n = len(sorted_rects)
+    xs = np.fromiter((r.x for r in sorted_rects), dtype=np.float64, count=n)
+    x2s = xs + np.fromiter((r.width for r in sorted_rects), dtype=np.float64, count=n)
+    x_overlap = np.triu((xs[:, None] < x2s[None, :]) & (x2s[:, None] > xs[None, :]), k=1)
+    candidate_pairs = np.argwhere(x_overlap).tolist()
+    if not candidate_pairs:
+        return {}
+
     max_iterations = 20
     for _ in range(max_iterations):
         any_adjusted = False
-        for i in range(len(sorted_rects)):
-            for j in range(i + 1, len(sorted_rects)):
-                a = sorted_rects[i]
-                b = sorted_rects[j]
-                if _rects_overlap(a, offsets[a.op_index], b, offsets[b.op_index]):
-                    # Push b upward
-                    shift = -(b.height + 4)
-                    offsets[b.op_index] += shift
-                    any_adjusted = True
+        for i, j in candidate_pairs:
+            a = sorted_rects[i]
+            b = sorted_rects[j]
+            if _rects_overlap(a, offsets[a.op_index], b, offsets[b.op_index]):
+                # Push b upward
+                shift = -(b.height + 4)
+                offsets[b.op_index] += shift
+                any_adjusted = True
         if not any_adjusted:
             break
 
@@ -223,7 +232,13 @@ def _font_params_for_bbox(
     Returns:
         (font_scale, font_thickness)
     """
-    target_px = bbox_height * style.font_height_ratio
+    return _font_params_cached(bbox_height, style.font_height_ratio)
+
+
+@functools.lru_cache(maxsize=256)
+def _font_params_cached(bbox_height: int, font_height_ratio: float) -> tuple[float, int]:
+    """Memoized body of _font_params_for_bbox (word heights on a page cluster)."""
+    target_px = bbox_height * font_height_ratio
     # cv2.FONT_HERSHEY_SIMPLEX baseline height ≈ 22 px at font_scale=1.0
     font_scale = max(target_px / 22.0, 0.4)
     font_thickness = max(round(font_scale * 1.5), 1)
@@ -241,10 +256,7 @@ def annotate_image(
 ) -> str:
     """Draw annotations on the original image and save to output_path.
 
-    Three-phase pipeline:
-      1. Collect label rectangles for all ops that render text.
-      2. Resolve overlaps → compute per-op y-offsets.
-      3. Render shapes and text with offsets applied.
+    File-based wrapper around :func:`annotate_image_array`.
 
     Args:
         image_path: Path to the original image.
@@ -256,13 +268,43 @@ def annotate_image(
     Returns:
         The output_path string.
     """
-    if style is None:
-        style = AnnotationStyle()
-
     img = cv2.imread(image_path)
     if img is None:
         raise FileNotFoundError(f"Cannot read image: {image_path}")
 
+    annotate_image_array(img, ocr_words, diff_ops, style)
+
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(output_path, img)
+    logger.info("Annotated image saved: %s", output_path)
+    return output_path
+
+
+def annotate_image_array(
+    img: np.ndarray,
+    ocr_words: list[dict],
+    diff_ops: list[DiffOp],
+    style: AnnotationStyle | None = None,
+) -> np.ndarray:
+    """Draw annotations onto a BGR image array in place and return it.
+
+    Three-phase pipeline:
+      1. Collect label rectangles for all ops that render text.
+      2. Resolve overlaps → compute per-op y-offsets.
+      3. Render shapes and text with offsets applied.
+
+    Args:
+        img: BGR image (H, W, 3), modified in place.
+        ocr_words: List of dicts with keys: text, bbox [x1,y1,x2,y2], confidence.
+        diff_ops: Diff operations from compute_word_diff().
+        style: Optional visual style overrides.
+
+    Returns:
+        The same *img* array, annotated.
+    """
+    if style is None:
+        style = AnnotationStyle()
+
     # Scale shape/line parameters to image resolution
     style = style.scaled(img.shape[0])
     image_width = img.shape[1]
@@ -290,10 +332,7 @@ def annotate_image(
         y_offset = label_offsets.get(block_idx, 0)
         _render_block(img, ocr_words, block, diff_ops, style, y_offset)
 
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    cv2.imwrite(output_path, img)
-    logger.info("Annotated image saved: %s", output_path)
-    return output_path
+    return img
 
 
 # ─── Block-level rendering (planning layer) ──────────────────────────────────
@@ -397,7 +436,7 @@ def _draw_phrase_block(
     if is_pure_extra:
         # Single extended strikethrough instead of individual per-word lines
         cy = (y1 + y2) // 2
-        cv2.line(img, (x1, cy), (x2, cy), COLOR_EXTRA, style.strikethrough_thickness)
+        cv2.line(img, (x1, cy), (x2, cy), COLOR_EXTRA, style.strikethrough_thickness, cv2.LINE_8)
     else:
         # Per-word shapes (text labels are handled by the combined label below)
         for op in block.ops:
@@ -419,7 +458,7 @@ def _draw_phrase_block(
                     bcy = (by1 + by2) // 2
                     cv2.line(
                         img, (bx1, bcy), (bx2, bcy),
-                        COLOR_EXTRA, style.strikethrough_thickness,
+                        COLOR_EXTRA, style.strikethrough_thickness, cv2.LINE_8,
                     )
             # MISSING ops have no bbox: skip individual shape
 
@@ -506,7 +545,7 @@ def _draw_extra(
 
     x1, y1, x2, y2 = bbox
     cy = (y1 + y2) // 2
-    cv2.line(img, (x1, cy), (x2, cy), COLOR_EXTRA, style.strikethrough_thickness)
+    cv2.line(img, (x1, cy), (x2, cy), COLOR_EXTRA, style.strikethrough_thickness, cv2.LINE_8)
 
 
 def _draw_missing(
@@ -528,9 +567,9 @@ def _draw_missing(
     # Draw caret symbol
     caret_top = insert_y - style.caret_size
     cv2.line(img, (insert_x - style.caret_size // 2, insert_y),
-             (insert_x, caret_top), COLOR_MISSING, 2)
+             (insert_x, caret_top), COLOR_MISSING, 2, cv2.LINE_8)
     cv2.line(img, (insert_x, caret_top),
-             (insert_x + style.caret_size // 2, insert_y), COLOR_MISSING, 2)
+             (insert_x + style.caret_size // 2, insert_y), COLOR_MISSING, 2, cv2.LINE_8)
 
     # Draw the missing word text above — sized relative to neighboring words
     if op.reference_word:
@@ -680,8 +719,12 @@ def render_from_annotations(
                   if not _has_custom_label_position(error_annotations[r.op_index])]
     label_offsets = _resolve_label_overlaps(auto_rects)
 
-    # Phase 3: Render shapes (OpenCV) and collect text operations
+    # Phase 3: Render shapes (OpenCV) and collect text operations.
+    # Strikethroughs and carets are collected as polylines and drawn with
+    # one cv2.polylines call per kind.
     text_ops: list[_TextOp] = []
+    strike_polylines: list[list[tuple[int, int]]] = []
+    caret_polylines: list[list[tuple[int, int]]] = []
 
     for i, ann in enumerate(error_annotations):
         y_offset = label_offsets.get(i, 0)
@@ -707,9 +750,9 @@ def render_from_annotations(
                     _COLOR_WRONG_RGB, font_path,
                 ))
         elif error_type == "extra":
-            _draw_extra_from_bbox(img, bbox, style)
+            strike_polylines.append(_strikethrough_points(bbox))
         elif error_type == "missing":
-            _draw_missing_shape(img, bbox, style)
+            caret_polylines.append(_caret_points(bbox, style))
             ref_word = ann.get("reference_word")
             if ref_word:
                 text_ops.append(_build_text_op_missing(
@@ -718,6 +761,17 @@ def render_from_annotations(
                     _COLOR_MISSING_RGB, font_path,
                 ))
 
+    if strike_polylines:
+        cv2.polylines(
+            img, np.array(strike_polylines, dtype=np.int32), False,
+            COLOR_EXTRA, style.strikethrough_thickness, cv2.LINE_8,
+        )
+    if caret_polylines:
+        cv2.polylines(
+            img, np.array(caret_polylines, dtype=np.int32), False,
+            COLOR_MISSING, 2, cv2.LINE_8,
+        )
+
     # Phase 4: Draw all text with PIL TrueType font
     if text_ops and font_path:
         _render_text_ops_pil(img, text_ops, font_path)
@@ -746,20 +800,27 @@ def _draw_wrong_shape(
     cv2.ellipse(img, (cx, cy), (w, h), 0, 0, 360, COLOR_WRONG, style.ellipse_thickness)
 
 
-def _draw_missing_shape(
-    img: np.ndarray,
+def _caret_points(
     bbox: tuple[int, int, int, int],
     style: AnnotationStyle,
-) -> None:
-    """Draw blue caret marker (shape only, no text)."""
+) -> list[tuple[int, int]]:
+    """Open polyline (bottom-left, top, bottom-right) of a caret under bbox."""
     x1, y1, x2, y2 = bbox
     cx = (x1 + x2) // 2
     caret_bottom = y2
     caret_top = caret_bottom - style.caret_size
-    cv2.line(img, (cx - style.caret_size // 2, caret_bottom),
-             (cx, caret_top), COLOR_MISSING, 2)
-    cv2.line(img, (cx, caret_top),
-             (cx + style.caret_size // 2, caret_bottom), COLOR_MISSING, 2)
+    return [
+        (cx - style.caret_size // 2, caret_bottom),
+        (cx, caret_top),
+        (cx + style.caret_size // 2, caret_bottom),
+    ]
+
+
+def _strikethrough_points(bbox: tuple[int, int, int, int]) -> list[tuple[int, int]]:
+    """Horizontal strikethrough segment across the vertical centre of bbox."""
+    x1, y1, x2, y2 = bbox
+    cy = (y1 + y2) // 2
+    return [(x1, cy), (x2, cy)]
 
 
 def _build_text_op_wrong(
@@ -1058,59 +1119,3 @@ def _draw_wrong_from_bbox(
             cv2.FONT_HERSHEY_SIMPLEX, font_scale, COLOR_WRONG, font_thick,
             cv2.LINE_AA,
         )
-
-
-def _draw_extra_from_bbox(
-    img: np.ndarray,
-    bbox: tuple[int, int, int, int],
-    style: AnnotationStyle,
-) -> None:
-    """Draw orange strikethrough across bbox."""
-    x1, y1, x2, y2 = bbox
-    cy = (y1 + y2) // 2
-    cv2.line(img, (x1, cy), (x2, cy), COLOR_EXTRA, style.strikethrough_thickness)
-
-
-def _draw_missing_from_bbox(
-    img: np.ndarray,
-    bbox: tuple[int, int, int, int],
-    reference_word: str | None,
-    style: AnnotationStyle,
-    label_y_offset: int = 0,
-    label_x: float | None = None,
-    label_y: float | None = None,
-    label_font_size: float | None = None,
-) -> None:
-    """Draw blue caret marker + reference word above."""
-    x1, y1, x2, y2 = bbox
-    cx = (x1 + x2) // 2
-    bbox_h = y2 - y1
-
-    # Caret symbol: fixed height of caret_size, bottom at bbox bottom
-    caret_bottom = y2
-    caret_top = caret_bottom - style.caret_size
-    cv2.line(img, (cx - style.caret_size // 2, caret_bottom),
-             (cx, caret_top), COLOR_MISSING, 2)
-    cv2.line(img, (cx, caret_top),
-             (cx + style.caret_size // 2, caret_bottom), COLOR_MISSING, 2)
-
-    if reference_word:
-        if label_font_size is not None and label_font_size > 0:
-            font_scale = max(label_font_size / 22.0, 0.4)
-            font_thick = max(round(font_scale * 1.5), 1)
-        else:
-            font_scale, font_thick = _font_params_for_bbox(bbox_h, style)
-        text_size = cv2.getTextSize(
-            reference_word, cv2.FONT_HERSHEY_SIMPLEX, font_scale, font_thick,
-        )[0]
-        if label_x is not None and label_y is not None:
-            text_x = int(label_x) - text_size[0] // 2
-            text_y = int(label_y) + text_size[1] // 2
-        else:
-            text_x = cx - text_size[0] // 2
-            text_y = caret_top - 4 + label_y_offset
-        cv2.putText(
-            img, reference_word, (text_x, text_y),
-            cv2.FONT_HERSHEY_SIMPLEX, font_scale, COLOR_MISSING, font_thick,
-            cv2.LINE_AA,
-        )
@@ -21,8 +21,16 @@ _MIN_INK_PIXELS: int = 5
 # Maximum area growth ratio; revert to original if exceeded.
 _MAX_AREA_GROWTH: float = 1.5
 
+# OpenCV entry points and flags bound once at import so the per-word loop
+# does not repeat module attribute lookups.
+_ADAPTIVE_THRESHOLD = cv2.adaptiveThreshold
+_ADAPTIVE_GAUSSIAN = cv2.ADAPTIVE_THRESH_GAUSSIAN_C
+_THRESH_BINARY_INV = cv2.THRESH_BINARY_INV
+_BOUNDING_RECT = cv2.boundingRect
+_COUNT_NON_ZERO = cv2.countNonZero
 
-def refine_word_bboxes(image_path: str, words: list[OcrWord]) -> list[OcrWord]:
+
+def refine_word_bboxes(image: str | np.ndarray, words: list[OcrWord]) -> list[OcrWord]:
     """Tighten each word bbox to its actual ink pixel extent.
 
     For each OcrWord, the algorithm:
@@ -32,7 +40,8 @@ def refine_word_bboxes(image_path: str, words: list[OcrWord]) -> list[OcrWord]:
     4. Falls back to the original bbox if too few pixels or area grows too much.
 
     Args:
-        image_path: Path to the original (pre-OCR) image.
+        image: Path to the image the OCR ran on, or that image already decoded
+            as a BGR array (skips reading it back from disk).
         words: List of OcrWord instances from the OCR step.
 
     Returns:
@@ -40,61 +49,89 @@ def refine_word_bboxes(image_path: str, words: list[OcrWord]) -> list[OcrWord]:
         Never raises — any error falls back to the original word list.
     """
     try:
-        img = cv2.imread(image_path)
-        if img is None:
-            logger.warning("bbox_refiner: cannot read %s", image_path)
+        binary = _ink_mask(image) if isinstance(image, np.ndarray) else _read_ink_mask(image)
+        if binary is None:
+            logger.warning("bbox_refiner: cannot read %s", image)
             return words
+        img_h, img_w = binary.shape
 
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        binary = cv2.adaptiveThreshold(
-            gray, 255,
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-            cv2.THRESH_BINARY_INV,
-            blockSize=15,
-            C=8,
-        )
-        img_h, img_w = img.shape[:2]
-
-        refined: list[OcrWord] = []
-        for word in words:
-            x1, y1, x2, y2 = (int(v) for v in word.bbox)
-            if x2 - x1 < 2 or y2 - y1 < 2:
-                refined.append(word)
-                continue
-
-            pad = max(4, int(max(x2 - x1, y2 - y1) * _PAD_RATIO))
-            rx1 = max(0, x1 - pad)
-            ry1 = max(0, y1 - pad)
-            rx2 = min(img_w, x2 + pad)
-            ry2 = min(img_h, y2 + pad)
-
-            region = binary[ry1:ry2, rx1:rx2]
-            ys, xs = np.where(region > 0)
-
-            if len(xs) < _MIN_INK_PIXELS:
-                refined.append(word)
-                continue
-
-            tx1 = rx1 + int(np.min(xs))
-            ty1 = ry1 + int(np.min(ys))
-            tx2 = rx1 + int(np.max(xs))
-            ty2 = ry1 + int(np.max(ys))
+        return _refine_words(binary, words, img_w, img_h)
 
-            orig_area = max(1, (x2 - x1) * (y2 - y1))
-            new_area = max(1, (tx2 - tx1) * (ty2 - ty1))
-
-            if new_area > orig_area * _MAX_AREA_GROWTH:
-                refined.append(word)
-                continue
+    except Exception:
+        logger.exception(
+            "bbox_refiner failed for %s — using original bboxes",
+            image if isinstance(image, str) else "in-memory image",
+        )
+        return words
 
-            refined.append(OcrWord(
-                text=word.text,
-                bbox=(float(tx1), float(ty1), float(tx2), float(ty2)),
-                confidence=word.confidence,
-            ))
 
-        return refined
+def _read_ink_mask(image_path: str) -> np.ndarray | None:
+    """Read *image_path* and return its ink mask, or None if unreadable."""
+    img = cv2.imread(image_path)
+    return None if img is None else _ink_mask(img)
+
+
+def _ink_mask(img: np.ndarray) -> np.ndarray:
+    """Return the adaptive-threshold ink mask (ink=255) of a BGR image."""
+    # Darkest channel per pixel: ink is dark in at least one channel
+    # (including blue/red pens), and a min is cheaper than BT.601 weights.
+    # np.minimum walks the interleaved channel views in place, whereas
+    # cv2 would first copy each non-contiguous channel slice.
+    gray = np.minimum(img[:, :, 0], img[:, :, 1])
+    np.minimum(gray, img[:, :, 2], out=gray)
+    return _ADAPTIVE_THRESHOLD(gray, 255, _ADAPTIVE_GAUSSIAN, _THRESH_BINARY_INV, 15, 8)
+
+
+def _refine_words(
+    binary: np.ndarray,
+    words: list[OcrWord],
+    img_w: int,
+    img_h: int,
+) -> list[OcrWord]:
+    """Refine every word's bbox against the binary ink mask."""
+    # Start from the input words; fallbacks keep their slot untouched and
+    # only successfully refined words are replaced.
+    refined = list(words)
+
+    # Search regions for all words in one vectorized pass:
+    # pad each bbox by _PAD_RATIO of its longer side, clamp to the image.
+    boxes = np.array([w.bbox for w in words], dtype=np.float64).reshape(-1, 4).astype(np.int32)
+    sizes = np.maximum(boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1])
+    pads = np.maximum(4, (sizes * _PAD_RATIO).astype(np.int32))
+    regions = np.clip(
+        boxes + pads[:, None] * np.array([-1, -1, 1, 1], dtype=np.int32),
+        0, np.array([img_w, img_h, img_w, img_h], dtype=np.int32),
+    )
+
+    for i, ((x1, y1, x2, y2), (rx1, ry1, rx2, ry2)) in enumerate(
+        zip(boxes.tolist(), regions.tolist()),
+    ):
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            continue
+
+        # Row-strided view into *binary*; OpenCV reads it without a copy.
+        # countNonZero + boundingRect are both SIMD scans in OpenCV and beat
+        # row/column projections via cv2.reduce (two reductions plus a
+        # NumPy nonzero per word).
+        region = binary[ry1:ry2, rx1:rx2]
+        if _COUNT_NON_ZERO(region) < _MIN_INK_PIXELS:
+            continue
+
+        bx, by, bw, bh = _BOUNDING_RECT(region)
+        tx1 = rx1 + bx
+        ty1 = ry1 + by
+        tx2 = rx1 + bx + bw - 1
+        ty2 = ry1 + by + bh - 1
+
+        orig_area = max(1, (x2 - x1) * (y2 - y1))
+        new_area = max(1, (tx2 - tx1) * (ty2 - ty1))
+
+        if new_area > orig_area * _MAX_AREA_GROWTH:
+            continue
+
+        word = words[i]
+        refined[i] = OcrWord(
+            word.text, (float(tx1), float(ty1), float(tx2), float(ty2)), word.confidence,
+        )
 
-    except Exception:
-        logger.exception("bbox_refiner failed for %s — using original bboxes", image_path)
-        return words
+    return refined
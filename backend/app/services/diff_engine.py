@@ -5,10 +5,19 @@ difflib.SequenceMatcher and outputs structured diff operations.
 """
 
 import difflib
+import functools
+import itertools
 import re
-from dataclasses import dataclass
+from collections import deque
 from enum import Enum
-from itertools import product
+from typing import NamedTuple
+
+try:
+    # C implementation of difflib.SequenceMatcher; same opcodes, faster on
+    # long multi-page word lists.
+    from cdifflib import CSequenceMatcher as _SequenceMatcher
+except ImportError:  # pure-Python fallback
+    _SequenceMatcher = difflib.SequenceMatcher
 
 
 class DiffType(str, Enum):
@@ -18,8 +27,7 @@ class DiffType(str, Enum):
     EXTRA = "extra"      # delete: OCR has word, reference doesn't
 
 
-@dataclass(frozen=True)
-class DiffOp:
+class DiffOp(NamedTuple):
     """A single diff operation between OCR and reference text."""
     diff_type: DiffType
     ocr_index: int | None       # Index in OCR word list (None for MISSING)
@@ -28,9 +36,30 @@ class DiffOp:
     reference_word: str | None  # The reference word (None for EXTRA)
 
 
+# ASCII characters that are not regex word characters (\w); trimming these
+# with str.strip covers nearly every token without touching the regex engine.
+_EDGE_PUNCT: str = "".join(
+    ch for ch in map(chr, range(128)) if not (ch.isalnum() or ch == "_")
+)
+# Full edge-trim pattern, only needed for non-ASCII punctuation (“ ” — 「 」…).
+_EDGE_NON_WORD_RE = re.compile(r"^[^\w]+|[^\w]+$")
+
+
+def _strip_edge_punct(word: str) -> str:
+    """Remove leading/trailing non-word characters, as _EDGE_NON_WORD_RE does."""
+    stripped = word.strip(_EDGE_PUNCT)
+    if stripped and not (
+        (stripped[0].isalnum() or stripped[0] == "_")
+        and (stripped[-1].isalnum() or stripped[-1] == "_")
+    ):
+        stripped = _EDGE_NON_WORD_RE.sub("", stripped)
+    return stripped
+
+
+@functools.lru_cache(maxsize=8192)
 def _normalize(word: str) -> str:
     """Normalize a word for comparison: lowercase + strip edge punctuation."""
-    return re.sub(r"^[^\w]+|[^\w]+$", "", word.lower())
+    return _strip_edge_punct(word.lower())
 
 
 # ---------------------------------------------------------------------------
@@ -62,10 +91,11 @@ _NUMBER_WORD_TO_INT: dict[str, int] = {
     "sixtieth": 60, "seventieth": 70, "eightieth": 80, "ninetieth": 90,
 }
 
-# Suffix pattern used to strip ordinal suffixes from Arabic numerals (1st, 2nd …)
-_ORDINAL_SUFFIX_RE = re.compile(r"(st|nd|rd|th)$")
+# Ordinal suffixes stripped from Arabic numerals (1st, 2nd …)
+_ORDINAL_SUFFIXES: frozenset[str] = frozenset({"st", "nd", "rd", "th"})
 
 
+@functools.lru_cache(maxsize=8192)
 def _parse_as_number(norm_word: str) -> int | None:
     """Return the integer value of a normalized word if it represents a number.
 
@@ -77,12 +107,15 @@ def _parse_as_number(norm_word: str) -> int | None:
 
     Returns None if the word cannot be interpreted as a number.
     """
-    # Strip ordinal suffix before trying int() so "1st" → "1"
-    arabic = _ORDINAL_SUFFIX_RE.sub("", norm_word)
-    try:
-        return int(arabic)
-    except ValueError:
-        pass
+    # int() can only succeed when the word starts with a decimal digit, so
+    # ordinary words skip the suffix strip and the failing int() call.
+    if norm_word[:1].isdecimal():
+        # Strip ordinal suffix before trying int() so "1st" → "1"
+        arabic = norm_word[:-2] if norm_word[-2:] in _ORDINAL_SUFFIXES else norm_word
+        try:
+            return int(arabic)
+        except ValueError:
+            pass
     return _NUMBER_WORD_TO_INT.get(norm_word)
 
 
@@ -95,6 +128,7 @@ def _are_number_equivalent(norm_a: str, norm_b: str) -> bool:
     return val_b is not None and val_a == val_b
 
 
+@functools.lru_cache(maxsize=8192)
 def _strip_display(word: str | None) -> str | None:
     """Strip edge punctuation for storage/display, preserving original case.
 
@@ -105,7 +139,7 @@ def _strip_display(word: str | None) -> str | None:
     """
     if word is None:
         return None
-    stripped = re.sub(r"^[^\w]+|[^\w]+$", "", word)
+    stripped = _strip_edge_punct(word)
     return stripped if stripped else word
 
 
@@ -115,7 +149,7 @@ def normalize_word_list(text: str) -> list[str]:
     Punctuation stripping is intentionally deferred to comparison time via
     _normalize(), so that display and annotations show the original words.
     """
-    return [w for w in text.split() if w]
+    return text.split()
 
 
 # ---------------------------------------------------------------------------
@@ -181,12 +215,19 @@ CONTRACTIONS: dict[str, list[list[str]]] = {
     "cannot": [["can", "not"]],
 }
 
-# Build reverse map: expansion tuple -> list of contractions
-_EXPANSION_TO_CONTRACTIONS: dict[tuple[str, ...], list[str]] = {}
-for _cword, _expansions in CONTRACTIONS.items():
-    for _exp in _expansions:
-        _key = tuple(_exp)
-        _EXPANSION_TO_CONTRACTIONS.setdefault(_key, []).append(_cword)
+# Contraction -> frozen set of its expansion tuples, for allocation-free
+# single-word equivalence checks.
+_CONTRACTION_EXPANSION_SETS: dict[str, frozenset[tuple[str, ...]]] = {
+    _cword: frozenset(tuple(_exp) for _exp in _expansions)
+    for _cword, _expansions in CONTRACTIONS.items()
+}
+
+# Contraction -> token count of its longest expansion.  Every word expands to
+# at least one token, so no P1/P2 match can span more following words.
+_MAX_EXPANSION_LEN: dict[str, int] = {
+    _cword: max(len(_exp) for _exp in _expansions)
+    for _cword, _expansions in CONTRACTIONS.items()
+}
 
 
 def _expand_normalized(norm_word: str) -> list[list[str]]:
@@ -200,36 +241,82 @@ def _expand_normalized(norm_word: str) -> list[list[str]]:
     return [[norm_word]]
 
 
-def _all_expansions(norm_words: list[str]) -> list[tuple[str, ...]]:
-    """Cartesian product of all possible expansions for a word sequence."""
-    per_word = [_expand_normalized(w) for w in norm_words]
-    result: list[tuple[str, ...]] = []
-    for combo in product(*per_word):
-        # combo is a tuple of lists; flatten into a single tuple of strings
-        flat: list[str] = []
-        for segment in combo:
-            flat.extend(segment)
-        result.append(tuple(flat))
-    return result
+def _all_expansions(
+    norm_words: list[str], max_len: int | None = None,
+) -> list[tuple[str, ...]]:
+    """All flattened expansion sequences for a word sequence.
+
+    Built word by word; non-contractions extend every partial sequence in
+    place, so only ambiguous contractions multiply the result.  With
+    *max_len*, partial sequences longer than that are dropped as soon as
+    they grow past it (they can never equal a sequence of that length).
+    """
+    acc: list[tuple[str, ...]] = [()]
+    for w in norm_words:
+        exps = _expand_normalized(w)
+        if len(exps) == 1:
+            seg = tuple(exps[0])
+            acc = [a + seg for a in acc]
+        else:
+            acc = [a + tuple(seg) for a in acc for seg in exps]
+        if max_len is not None:
+            acc = [a for a in acc if len(a) <= max_len]
+            if not acc:
+                break
+    return acc
 
 
-def _are_contraction_equivalent(
-    norm_a: list[str], norm_b: list[str],
-) -> bool:
-    """Check if two normalized word sequences are equivalent via contractions."""
+def _are_single_word_equivalent(norm_a: str, norm_b: str) -> bool:
+    """True if two normalized words are equal or share a contraction expansion.
+
+    "it's" ~ "he's" is False, "it's" ~ "it's" is True, and a plain word only
+    matches a contraction that expands to that single word.
+    """
     if norm_a == norm_b:
         return True
-    expansions_a = _all_expansions(norm_a)
-    expansions_b = _all_expansions(norm_b)
-    # Check if any expansion of A matches any expansion of B
-    set_b = set(expansions_b)
-    return any(ea in set_b for ea in expansions_a)
+    set_a = _CONTRACTION_EXPANSION_SETS.get(norm_a)
+    set_b = _CONTRACTION_EXPANSION_SETS.get(norm_b)
+    if set_a is None:
+        return set_b is not None and (norm_a,) in set_b
+    if set_b is None:
+        return (norm_b,) in set_a
+    return not set_a.isdisjoint(set_b)
+
+
+def _first_equivalent_take(
+    target: str, head: list[str], tail: list[str],
+) -> int | None:
+    """Smallest ``take >= 1`` such that ``head + tail[:take]`` is
+    contraction-equivalent to the single word *target*, or None.
+
+    The expansion frontier of the growing sequence is extended one word at a
+    time instead of re-expanding the whole sequence for every *take*.
+    """
+    targets = _CONTRACTION_EXPANSION_SETS.get(target) or frozenset([(target,)])
+    longest = max(len(t) for t in targets)
+    frontier = _all_expansions(head, max_len=longest)
+    for take, word in enumerate(tail, 1):
+        frontier = [
+            f + seg
+            for f in frontier
+            for seg in map(tuple, _expand_normalized(word))
+            if len(f) + len(seg) <= longest
+        ]
+        if not frontier:
+            return None
+        if any(f in targets for f in frontier):
+            return take
+    return None
 
 
 def _fix_contractions(
     ops: list[DiffOp],
     ocr_words: list[str],
     ref_words: list[str],
+    norm_ocr: list[str],
+    norm_ref: list[str],
+    raw_ocr: list[str],
+    raw_ref: list[str],
 ) -> list[DiffOp]:
     """Post-process diff ops to fix contraction equivalences.
 
@@ -242,16 +329,32 @@ def _fix_contractions(
 
     When a WRONG op is consumed for its ref/OCR word during P1/P2 matching,
     the released counterpart is re-paired with available MISSING/EXTRA ops.
+
+    *ocr_words* / *ref_words* are the display (edge-stripped) words the ops
+    carry; *norm_ocr* / *norm_ref* are the already-normalized word lists that
+    the caller diffed, so they are not recomputed here.  A merged multi-word
+    side is joined from the unstripped *raw_ocr* / *raw_ref* words and then
+    edge-stripped as a whole, so punctuation between the words is kept.
     """
-    norm_ocr = [_normalize(w) for w in ocr_words]
-    norm_ref = [_normalize(w) for w in ref_words]
+
+    # Hot-loop locals: ops here always carry DiffType members (built by
+    # compute_word_diff), so identity checks replace str-enum equality.
+    correct = DiffType.CORRECT
+    wrong = DiffType.WRONG
+    n_ops = len(ops)
+
+    # next_correct[k]: index of the first CORRECT op at or after k (n_ops if
+    # none), so each run end is a lookup instead of a rescan per WRONG op.
+    next_correct = [n_ops] * (n_ops + 1)
+    for k in range(n_ops - 1, -1, -1):
+        next_correct[k] = k if ops[k].diff_type is correct else next_correct[k + 1]
 
     result: list[DiffOp] = []
     i = 0
-    while i < len(ops):
+    while i < n_ops:
         op = ops[i]
 
-        if op.diff_type != DiffType.WRONG:
+        if op.diff_type is not wrong:
             result.append(op)
             i += 1
             continue
@@ -261,7 +364,7 @@ def _fix_contractions(
         nb = norm_ref[op.ref_index]
 
         # P0: single WRONG, direct equivalence (contraction or number word ↔ digit)
-        if _are_contraction_equivalent([na], [nb]) or _are_number_equivalent(na, nb):
+        if _are_single_word_equivalent(na, nb) or _are_number_equivalent(na, nb):
             result.append(DiffOp(
                 diff_type=DiffType.CORRECT,
                 ocr_index=op.ocr_index,
@@ -272,34 +375,37 @@ def _fix_contractions(
             i += 1
             continue
 
+        # P1/P2 need a contraction on one side; most WRONGs are plain typos
+        if na not in CONTRACTIONS and nb not in CONTRACTIONS:
+            result.append(op)
+            i += 1
+            continue
+
         # Collect the run of consecutive non-CORRECT ops after this one
-        run_end = i + 1
-        while run_end < len(ops) and ops[run_end].diff_type != DiffType.CORRECT:
-            run_end += 1
+        run_end = next_correct[i + 1]
         run = ops[i + 1 : run_end]
 
         # P1: OCR word is a contraction, ref words spread across following ops
         if na in CONTRACTIONS and run:
             # Collect ops from run that carry a ref_index (WRONG or MISSING)
-            ref_bearing = [(k, run[k]) for k in range(len(run))
-                           if run[k].ref_index is not None]
-
-            matched = False
-            for take in range(1, len(ref_bearing) + 1):
-                ref_norms = [nb]
-                for _, rb_op in ref_bearing[:take]:
-                    assert rb_op.ref_index is not None
-                    ref_norms.append(norm_ref[rb_op.ref_index])
+            # (only as many as the longest expansion of na could absorb)
+            ref_bearing = list(itertools.islice(
+                ((k, rop) for k, rop in enumerate(run) if rop.ref_index is not None),
+                _MAX_EXPANSION_LEN[na],
+            ))
 
-                if not _are_contraction_equivalent([na], ref_norms):
-                    continue
+            bearing_norms = [norm_ref[rb_op.ref_index]  # type: ignore[index]
+                             for _, rb_op in ref_bearing]
 
+            matched = False
+            take = _first_equivalent_take(na, [nb], bearing_norms)
+            if take is not None:
                 # Match found — build CORRECT op
                 consumed_run_indices = {k for k, _ in ref_bearing[:take]}
-                merged_ref = [op.reference_word or ""]
+                merged_ref = [raw_ref[op.ref_index]]
                 released_ocr: list[DiffOp] = []
                 for _, rb_op in ref_bearing[:take]:
-                    merged_ref.append(rb_op.reference_word or "")
+                    merged_ref.append(raw_ref[rb_op.ref_index])  # type: ignore[index]
                     if rb_op.diff_type == DiffType.WRONG:
                         released_ocr.append(rb_op)
 
@@ -308,7 +414,7 @@ def _fix_contractions(
                     ocr_index=op.ocr_index,
                     ref_index=op.ref_index,
                     ocr_word=op.ocr_word,
-                    reference_word=" ".join(merged_ref),
+                    reference_word=_strip_display(" ".join(merged_ref)),
                 ))
 
                 # Non-consumed ops from the run
@@ -317,22 +423,22 @@ def _fix_contractions(
 
                 # Re-pair released OCR words (from consumed WRONGs) with MISSING ops
                 missing_indices_used: set[int] = set()
+                missing_queue = deque(ri for ri, rop in enumerate(remaining)
+                                      if rop.diff_type == DiffType.MISSING)
                 for roc in released_ocr:
-                    paired = False
-                    for ri, rop in enumerate(remaining):
-                        if ri not in missing_indices_used and rop.diff_type == DiffType.MISSING:
-                            assert roc.ocr_index is not None
-                            result.append(DiffOp(
-                                diff_type=DiffType.WRONG,
-                                ocr_index=roc.ocr_index,
-                                ref_index=rop.ref_index,
-                                ocr_word=ocr_words[roc.ocr_index],
-                                reference_word=rop.reference_word,
-                            ))
-                            missing_indices_used.add(ri)
-                            paired = True
-                            break
-                    if not paired:
+                    if missing_queue:
+                        ri = missing_queue.popleft()
+                        rop = remaining[ri]
+                        assert roc.ocr_index is not None
+                        result.append(DiffOp(
+                            diff_type=DiffType.WRONG,
+                            ocr_index=roc.ocr_index,
+                            ref_index=rop.ref_index,
+                            ocr_word=ocr_words[roc.ocr_index],
+                            reference_word=rop.reference_word,
+                        ))
+                        missing_indices_used.add(ri)
+                    else:
                         assert roc.ocr_index is not None
                         result.append(DiffOp(
                             diff_type=DiffType.EXTRA,
@@ -349,19 +455,12 @@ def _fix_contractions(
 
                 i = run_end
                 matched = True
-                break
 
             # P1b: nb is MISSING; subsequent ref words alone match the OCR contraction.
             # Example: OCR "you're" vs ref "of you are" → MISSING "of", CORRECT "you're"↔"you are"
             if not matched and ref_bearing:
-                for take in range(1, len(ref_bearing) + 1):
-                    ref_norms_b = [
-                        norm_ref[rb_op.ref_index]  # type: ignore[arg-type]
-                        for _, rb_op in ref_bearing[:take]
-                    ]
-                    if not _are_contraction_equivalent([na], ref_norms_b):
-                        continue
-
+                take = _first_equivalent_take(na, [], bearing_norms)
+                if take is not None:
                     # nb is MISSING; bearing ref words form CORRECT with na
                     result.append(DiffOp(
                         diff_type=DiffType.MISSING,
@@ -372,7 +471,8 @@ def _fix_contractions(
                     ))
 
                     consumed_b = {k for k, _ in ref_bearing[:take]}
-                    merged_ref_b = [rb_op.reference_word or "" for _, rb_op in ref_bearing[:take]]
+                    merged_ref_b = [raw_ref[rb_op.ref_index]  # type: ignore[index]
+                                    for _, rb_op in ref_bearing[:take]]
                     released_ocr_b: list[DiffOp] = [
                         rb_op for _, rb_op in ref_bearing[:take]
                         if rb_op.diff_type == DiffType.WRONG
@@ -383,27 +483,27 @@ def _fix_contractions(
                         ocr_index=op.ocr_index,
                         ref_index=ref_bearing[0][1].ref_index,
                         ocr_word=op.ocr_word,
-                        reference_word=" ".join(merged_ref_b),
+                        reference_word=_strip_display(" ".join(merged_ref_b)),
                     ))
 
                     remaining_b = [run[k] for k in range(len(run)) if k not in consumed_b]
                     missing_used_b: set[int] = set()
+                    missing_queue_b = deque(ri for ri, rop in enumerate(remaining_b)
+                                            if rop.diff_type == DiffType.MISSING)
                     for roc in released_ocr_b:
-                        paired = False
-                        for ri, rop in enumerate(remaining_b):
-                            if ri not in missing_used_b and rop.diff_type == DiffType.MISSING:
-                                assert roc.ocr_index is not None
-                                result.append(DiffOp(
-                                    diff_type=DiffType.WRONG,
-                                    ocr_index=roc.ocr_index,
-                                    ref_index=rop.ref_index,
-                                    ocr_word=ocr_words[roc.ocr_index],
-                                    reference_word=rop.reference_word,
-                                ))
-                                missing_used_b.add(ri)
-                                paired = True
-                                break
-                        if not paired:
+                        if missing_queue_b:
+                            ri = missing_queue_b.popleft()
+                            rop = remaining_b[ri]
+                            assert roc.ocr_index is not None
+                            result.append(DiffOp(
+                                diff_type=DiffType.WRONG,
+                                ocr_index=roc.ocr_index,
+                                ref_index=rop.ref_index,
+                                ocr_word=ocr_words[roc.ocr_index],
+                                reference_word=rop.reference_word,
+                            ))
+                            missing_used_b.add(ri)
+                        else:
                             assert roc.ocr_index is not None
                             result.append(DiffOp(
                                 diff_type=DiffType.EXTRA,
@@ -419,7 +519,6 @@ def _fix_contractions(
 
                     i = run_end
                     matched = True
-                    break
 
             if matched:
                 continue
@@ -427,25 +526,24 @@ def _fix_contractions(
         # P2: Ref word is a contraction, OCR words spread across following ops
         if nb in CONTRACTIONS and run:
             # Collect ops from run that carry an ocr_index (WRONG or EXTRA)
-            ocr_bearing = [(k, run[k]) for k in range(len(run))
-                           if run[k].ocr_index is not None]
-
-            matched = False
-            for take in range(1, len(ocr_bearing) + 1):
-                ocr_norms = [na]
-                for _, ob_op in ocr_bearing[:take]:
-                    assert ob_op.ocr_index is not None
-                    ocr_norms.append(norm_ocr[ob_op.ocr_index])
+            # (only as many as the longest expansion of nb could absorb)
+            ocr_bearing = list(itertools.islice(
+                ((k, rop) for k, rop in enumerate(run) if rop.ocr_index is not None),
+                _MAX_EXPANSION_LEN[nb],
+            ))
 
-                if not _are_contraction_equivalent(ocr_norms, [nb]):
-                    continue
+            bearing_norms = [norm_ocr[ob_op.ocr_index]  # type: ignore[index]
+                             for _, ob_op in ocr_bearing]
 
+            matched = False
+            take = _first_equivalent_take(nb, [na], bearing_norms)
+            if take is not None:
                 # Match found — build CORRECT op
                 consumed_run_indices = {k for k, _ in ocr_bearing[:take]}
-                merged_ocr = [op.ocr_word or ""]
+                merged_ocr = [raw_ocr[op.ocr_index]]
                 released_ref: list[DiffOp] = []
                 for _, ob_op in ocr_bearing[:take]:
-                    merged_ocr.append(ob_op.ocr_word or "")
+                    merged_ocr.append(raw_ocr[ob_op.ocr_index])  # type: ignore[index]
                     if ob_op.diff_type == DiffType.WRONG:
                         released_ref.append(ob_op)
 
@@ -453,7 +551,7 @@ def _fix_contractions(
                     diff_type=DiffType.CORRECT,
                     ocr_index=op.ocr_index,
                     ref_index=op.ref_index,
-                    ocr_word=" ".join(merged_ocr),
+                    ocr_word=_strip_display(" ".join(merged_ocr)),
                     reference_word=op.reference_word,
                 ))
 
@@ -463,22 +561,22 @@ def _fix_contractions(
 
                 # Re-pair released ref words (from consumed WRONGs) with EXTRA ops
                 extra_indices_used: set[int] = set()
+                extra_queue = deque(ri for ri, rop in enumerate(remaining)
+                                    if rop.diff_type == DiffType.EXTRA)
                 for rref in released_ref:
-                    paired = False
-                    for ri, rop in enumerate(remaining):
-                        if ri not in extra_indices_used and rop.diff_type == DiffType.EXTRA:
-                            assert rref.ref_index is not None
-                            result.append(DiffOp(
-                                diff_type=DiffType.WRONG,
-                                ocr_index=rop.ocr_index,
-                                ref_index=rref.ref_index,
-                                ocr_word=rop.ocr_word,
-                                reference_word=ref_words[rref.ref_index],
-                            ))
-                            extra_indices_used.add(ri)
-                            paired = True
-                            break
-                    if not paired:
+                    if extra_queue:
+                        ri = extra_queue.popleft()
+                        rop = remaining[ri]
+                        assert rref.ref_index is not None
+                        result.append(DiffOp(
+                            diff_type=DiffType.WRONG,
+                            ocr_index=rop.ocr_index,
+                            ref_index=rref.ref_index,
+                            ocr_word=rop.ocr_word,
+                            reference_word=ref_words[rref.ref_index],
+                        ))
+                        extra_indices_used.add(ri)
+                    else:
                         assert rref.ref_index is not None
                         result.append(DiffOp(
                             diff_type=DiffType.MISSING,
@@ -495,19 +593,12 @@ def _fix_contractions(
 
                 i = run_end
                 matched = True
-                break
 
             # P2b: na is EXTRA; subsequent OCR words alone match the ref contraction.
             # Example: OCR "of you are" vs ref "you're" → EXTRA "of", CORRECT "you are"↔"you're"
             if not matched and ocr_bearing:
-                for take in range(1, len(ocr_bearing) + 1):
-                    ocr_norms_b = [
-                        norm_ocr[ob_op.ocr_index]  # type: ignore[arg-type]
-                        for _, ob_op in ocr_bearing[:take]
-                    ]
-                    if not _are_contraction_equivalent(ocr_norms_b, [nb]):
-                        continue
-
+                take = _first_equivalent_take(nb, [], bearing_norms)
+                if take is not None:
                     # na is EXTRA; bearing OCR words form CORRECT with nb
                     result.append(DiffOp(
                         diff_type=DiffType.EXTRA,
@@ -518,7 +609,8 @@ def _fix_contractions(
                     ))
 
                     consumed_b = {k for k, _ in ocr_bearing[:take]}
-                    merged_ocr_b = [ob_op.ocr_word or "" for _, ob_op in ocr_bearing[:take]]
+                    merged_ocr_b = [raw_ocr[ob_op.ocr_index]  # type: ignore[index]
+                                    for _, ob_op in ocr_bearing[:take]]
                     released_ref_b: list[DiffOp] = [
                         ob_op for _, ob_op in ocr_bearing[:take]
                         if ob_op.diff_type == DiffType.WRONG
@@ -528,28 +620,28 @@ def _fix_contractions(
                         diff_type=DiffType.CORRECT,
                         ocr_index=ocr_bearing[0][1].ocr_index,
                         ref_index=op.ref_index,
-                        ocr_word=" ".join(merged_ocr_b),
+                        ocr_word=_strip_display(" ".join(merged_ocr_b)),
                         reference_word=op.reference_word,
                     ))
 
                     remaining_b = [run[k] for k in range(len(run)) if k not in consumed_b]
                     extra_used_b: set[int] = set()
+                    extra_queue_b = deque(ri for ri, rop in enumerate(remaining_b)
+                                          if rop.diff_type == DiffType.EXTRA)
                     for rref in released_ref_b:
-                        paired = False
-                        for ri, rop in enumerate(remaining_b):
-                            if ri not in extra_used_b and rop.diff_type == DiffType.EXTRA:
-                                assert rref.ref_index is not None
-                                result.append(DiffOp(
-                                    diff_type=DiffType.WRONG,
-                                    ocr_index=rop.ocr_index,
-                                    ref_index=rref.ref_index,
-                                    ocr_word=rop.ocr_word,
-                                    reference_word=ref_words[rref.ref_index],
-                                ))
-                                extra_used_b.add(ri)
-                                paired = True
-                                break
-                        if not paired:
+                        if extra_queue_b:
+                            ri = extra_queue_b.popleft()
+                            rop = remaining_b[ri]
+                            assert rref.ref_index is not None
+                            result.append(DiffOp(
+                                diff_type=DiffType.WRONG,
+                                ocr_index=rop.ocr_index,
+                                ref_index=rref.ref_index,
+                                ocr_word=rop.ocr_word,
+                                reference_word=ref_words[rref.ref_index],
+                            ))
+                            extra_used_b.add(ri)
+                        else:
                             assert rref.ref_index is not None
                             result.append(DiffOp(
                                 diff_type=DiffType.MISSING,
@@ -565,7 +657,6 @@ def _fix_contractions(
 
                     i = run_end
                     matched = True
-                    break
 
             if matched:
                 continue
@@ -583,7 +674,8 @@ def compute_word_diff(
 ) -> list[DiffOp]:
     """Compute word-level diff between OCR output and reference text.
 
-    Uses difflib.SequenceMatcher on normalized words.
+    Uses difflib.SequenceMatcher (the cdifflib C port when installed) on
+    normalized words.
 
     Args:
         ocr_words: Words recognized by OCR.
@@ -594,81 +686,57 @@ def compute_word_diff(
     """
     norm_ocr = [_normalize(w) for w in ocr_words]
     norm_ref = [_normalize(w) for w in reference_words]
-
-    matcher = difflib.SequenceMatcher(None, norm_ocr, norm_ref, autojunk=False)
+    # Ops carry edge-punctuation-stripped words so every downstream consumer
+    # (DB, annotated images, UI diff display) sees clean words; strip each
+    # input word once rather than every op field after the fact.
+    display_ocr = [_strip_display(w) for w in ocr_words]
+    display_ref = [_strip_display(w) for w in reference_words]
+
+    if norm_ocr == norm_ref:
+        # Perfect transcription: every word pairs with itself, and the
+        # contraction pass would leave an all-CORRECT list untouched.
+        correct = DiffType.CORRECT
+        return [
+            DiffOp(correct, idx, idx, ocr_word, ref_word)
+            for idx, (ocr_word, ref_word) in enumerate(zip(display_ocr, display_ref))
+        ]
+
+    matcher = _SequenceMatcher(None, norm_ocr, norm_ref, autojunk=False)
     ops: list[DiffOp] = []
+    append = ops.append
+    # DiffOp fields, positionally: diff_type, ocr_index, ref_index,
+    # ocr_word, reference_word.
+    correct = DiffType.CORRECT
+    wrong = DiffType.WRONG
+    missing = DiffType.MISSING
+    extra = DiffType.EXTRA
 
     for tag, i1, i2, j1, j2 in matcher.get_opcodes():
         if tag == "equal":
             for ocr_idx, ref_idx in zip(range(i1, i2), range(j1, j2)):
-                ops.append(DiffOp(
-                    diff_type=DiffType.CORRECT,
-                    ocr_index=ocr_idx,
-                    ref_index=ref_idx,
-                    ocr_word=ocr_words[ocr_idx],
-                    reference_word=reference_words[ref_idx],
-                ))
+                append(DiffOp(correct, ocr_idx, ref_idx,
+                              display_ocr[ocr_idx], display_ref[ref_idx]))
         elif tag == "replace":
             # Pair up replacements; handle uneven lengths
-            ocr_range = list(range(i1, i2))
-            ref_range = list(range(j1, j2))
-            max_len = max(len(ocr_range), len(ref_range))
-            for k in range(max_len):
-                if k < len(ocr_range) and k < len(ref_range):
-                    ops.append(DiffOp(
-                        diff_type=DiffType.WRONG,
-                        ocr_index=ocr_range[k],
-                        ref_index=ref_range[k],
-                        ocr_word=ocr_words[ocr_range[k]],
-                        reference_word=reference_words[ref_range[k]],
-                    ))
-                elif k < len(ocr_range):
-                    ops.append(DiffOp(
-                        diff_type=DiffType.EXTRA,
-                        ocr_index=ocr_range[k],
-                        ref_index=None,
-                        ocr_word=ocr_words[ocr_range[k]],
-                        reference_word=None,
-                    ))
+            n_ocr = i2 - i1
+            n_ref = j2 - j1
+            for k in range(max(n_ocr, n_ref)):
+                if k < n_ocr and k < n_ref:
+                    append(DiffOp(wrong, i1 + k, j1 + k,
+                                  display_ocr[i1 + k], display_ref[j1 + k]))
+                elif k < n_ocr:
+                    append(DiffOp(extra, i1 + k, None, display_ocr[i1 + k], None))
                 else:
-                    ops.append(DiffOp(
-                        diff_type=DiffType.MISSING,
-                        ocr_index=None,
-                        ref_index=ref_range[k],
-                        ocr_word=None,
-                        reference_word=reference_words[ref_range[k]],
-                    ))
+                    append(DiffOp(missing, None, j1 + k, None, display_ref[j1 + k]))
         elif tag == "delete":
             # OCR has extra words not in reference
             for ocr_idx in range(i1, i2):
-                ops.append(DiffOp(
-                    diff_type=DiffType.EXTRA,
-                    ocr_index=ocr_idx,
-                    ref_index=None,
-                    ocr_word=ocr_words[ocr_idx],
-                    reference_word=None,
-                ))
+                append(DiffOp(extra, ocr_idx, None, display_ocr[ocr_idx], None))
         elif tag == "insert":
             # Reference has words missing from OCR
             for ref_idx in range(j1, j2):
-                ops.append(DiffOp(
-                    diff_type=DiffType.MISSING,
-                    ocr_index=None,
-                    ref_index=ref_idx,
-                    ocr_word=None,
-                    reference_word=reference_words[ref_idx],
-                ))
+                append(DiffOp(missing, None, ref_idx, None, display_ref[ref_idx]))
 
-    raw_ops = _fix_contractions(ops, ocr_words, reference_words)
-    # Strip edge punctuation from all word fields so every downstream consumer
-    # (DB, annotated images, UI diff display) sees clean words.
-    return [
-        DiffOp(
-            diff_type=op.diff_type,
-            ocr_index=op.ocr_index,
-            ref_index=op.ref_index,
-            ocr_word=_strip_display(op.ocr_word),
-            reference_word=_strip_display(op.reference_word),
-        )
-        for op in raw_ops
-    ]
+    return _fix_contractions(
+        ops, display_ocr, display_ref, norm_ocr, norm_ref, ocr_words, reference_words,
+    )
@@ -9,24 +9,67 @@ Public interface:
   - OcrResult(raw_text, words)
   - ProviderConfig(base_url, api_key, model)
   - async run_ocr(image_path, model=None, provider_config=None) -> OcrResult
+  - async close_all_clients()
 """
 
 import asyncio
 import base64
-import json
+import hashlib
+import importlib.util
+import io
 import logging
+import math
 import os
+import random
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
+from urllib.parse import urlsplit
 
-from PIL import Image
+import orjson
+from PIL import ExifTags, Image, ImageOps
 
 from app.config import get_settings
 
 logger = logging.getLogger("handwrite_diff.ocr")
 
-# Per-(base_url, api_key) client cache — avoids reinitializing on every call
-_client_cache: dict[tuple[str, str], object] = {}
+# Per-(base_url, api_key) client cache — avoids reinitializing on every call.
+# Bounded LRU; clients hold no connections of their own (see below), so an
+# evicted one is simply dropped.
+_CLIENT_CACHE_MAX_ENTRIES = 32
+_client_cache: OrderedDict[tuple[str, str], object] = OrderedDict()
+
+# One shared HTTP connection pool per origin (scheme://host:port), used by
+# every client talking to that relay regardless of API key.  Multiplexed
+# over HTTP/2 when the h2 package is installed.
+_http_client_cache: dict[str, object] = {}
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Caps in-flight API requests across all tasks; created on first use.
+_api_semaphore: asyncio.Semaphore | None = None
+
+
+class _RateLimiter:
+    """Spaces API request starts at least ``1 / rps`` seconds apart.
+
+    Each caller reserves the next free slot synchronously and then sleeps
+    until it, so no lock is needed on the single-threaded event loop.
+    """
+
+    def __init__(self, rps: float) -> None:
+        self._interval = 1.0 / rps
+        self._next_slot = 0.0
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# Process-wide limiter from gemini_max_rps (None = unlimited); created on first use.
+_rate_limiter: _RateLimiter | None = None
 
 
 @dataclass(frozen=True)
@@ -52,6 +95,17 @@ class ProviderConfig:
     model: str
 
 
+# Content-addressed OCR results, keyed by (image sha256, base_url, model).
+# Identical images (retries, re-submissions) skip the API round-trip.
+# Bounded LRU: least recently used entries are evicted first.  Entries hold
+# (raw_text, words tuple) so a caller mutating its result's word list cannot
+# corrupt later hits; every hit gets a fresh OcrResult.
+_OCR_CACHE_MAX_ENTRIES = 1024
+_ocr_cache: OrderedDict[
+    tuple[str, str, str], tuple[str, tuple[OcrWord, ...]]
+] = OrderedDict()
+
+
 # -- System prompt for OCR --
 
 _SYSTEM_PROMPT = (
@@ -74,38 +128,98 @@ _SYSTEM_PROMPT = (
 
 _USER_PROMPT = "Detect all handwritten words in this image with their bounding boxes."
 
+# Request parts that never change; only the image URL differs per call.
+_SYSTEM_MESSAGE = {"role": "system", "content": _SYSTEM_PROMPT}
+_USER_TEXT_PART = {"type": "text", "text": _USER_PROMPT}
+_RESPONSE_FORMAT = {"type": "json_object"}
+
 
 def _get_client(base_url: str | None, api_key: str) -> object:
     """Return a cached AsyncOpenAI client for the given (base_url, api_key) pair.
 
     On first creation, clears SOCKS/HTTP proxy env vars so the connection
-    goes directly to the relay endpoint.
+    goes directly to the relay endpoint.  Clients for the same origin share
+    one connection pool from _get_http_client().
     """
     cache_key = (base_url or "", api_key)
-    if cache_key not in _client_cache:
-        from openai import AsyncOpenAI
-
-        # Clear proxy env vars — the API endpoint is itself a relay.
-        for var in (
-            "ALL_PROXY", "all_proxy",
-            "HTTP_PROXY", "http_proxy",
-            "HTTPS_PROXY", "https_proxy",
-        ):
-            val = os.environ.pop(var, "")
-            if val:
-                logger.info("Cleared %s for direct API connection", var)
-
-        _client_cache[cache_key] = AsyncOpenAI(
-            api_key=api_key,
-            base_url=base_url,  # None = use OpenAI default
-            timeout=get_settings().gemini_timeout,
-        )
-        logger.info(
-            "OpenAI client initialized (base_url: %s)",
-            base_url or "(default)",
-        )
-
-    return _client_cache[cache_key]
+    client = _client_cache.get(cache_key)
+    if client is not None:
+        _client_cache.move_to_end(cache_key)
+        return client
+
+    from openai import AsyncOpenAI
+
+    # Clear proxy env vars — the API endpoint is itself a relay.
+    for var in (
+        "ALL_PROXY", "all_proxy",
+        "HTTP_PROXY", "http_proxy",
+        "HTTPS_PROXY", "https_proxy",
+    ):
+        val = os.environ.pop(var, "")
+        if val:
+            logger.info("Cleared %s for direct API connection", var)
+
+    client = AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,  # None = use OpenAI default
+        timeout=get_settings().gemini_timeout,
+        http_client=_get_http_client(base_url),
+    )
+    _client_cache[cache_key] = client
+    logger.info(
+        "OpenAI client initialized (base_url: %s)",
+        base_url or "(default)",
+    )
+
+    if len(_client_cache) > _CLIENT_CACHE_MAX_ENTRIES:
+        _client_cache.popitem(last=False)
+
+    return client
+
+
+def _get_http_client(base_url: str | None) -> object:
+    """Return the shared HTTP client for *base_url*'s origin."""
+    parts = urlsplit(base_url or "")
+    origin = f"{parts.scheme}://{parts.netloc}"
+    http_client = _http_client_cache.get(origin)
+    if http_client is None:
+        from openai import DefaultAsyncHttpxClient
+
+        # openai's defaults (limits, redirects) plus HTTP/2 when available.
+        http_client = DefaultAsyncHttpxClient(http2=_HTTP2_AVAILABLE)
+        _http_client_cache[origin] = http_client
+    return http_client
+
+
+async def close_all_clients() -> None:
+    """Close the shared connection pools (call on application shutdown)."""
+    http_clients = list(_http_client_cache.values())
+    _http_client_cache.clear()
+    _client_cache.clear()
+    for http_client in http_clients:
+        try:
+            await http_client.aclose()  # type: ignore[attr-defined]
+        except Exception:
+            logger.exception("Failed to close OCR HTTP client")
+
+
+def _get_api_semaphore() -> asyncio.Semaphore:
+    """Return the process-wide semaphore bounding concurrent API requests."""
+    global _api_semaphore
+    if _api_semaphore is None:
+        _api_semaphore = asyncio.Semaphore(max(1, get_settings().gemini_max_concurrency))
+    return _api_semaphore
+
+
+async def _wait_for_rate_limit() -> None:
+    """Block until the process-wide request rate allows another API call."""
+    global _rate_limiter
+    rps = get_settings().gemini_max_rps
+    if rps <= 0:
+        return
+    if _rate_limiter is None:
+        _rate_limiter = _RateLimiter(rps)
+    await _rate_limiter.acquire()
 
 
 def _resolve_client_and_model(
@@ -148,23 +262,120 @@ def _convert_bbox(
     )
 
 
-def _image_to_data_url(image_path: str) -> str:
-    """Encode image as base64 data URL for OpenAI vision API."""
-    ext = Path(image_path).suffix.lower()
-    mime_map = {
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".png": "image/png",
-        ".webp": "image/webp",
-        ".gif": "image/gif",
-        ".bmp": "image/bmp",
-    }
-    mime_type = mime_map.get(ext, "image/jpeg")
+def _file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a file, read in 64 KiB chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
 
+def _ocr_cache_key(
+    image_sha256: str,
+    model: str | None,
+    provider_config: ProviderConfig | None,
+) -> tuple[str, str, str]:
+    """Cache key for an image under the endpoint/model that would serve it."""
+    if provider_config is not None:
+        return image_sha256, provider_config.base_url, model or provider_config.model
+    settings = get_settings()
+    return image_sha256, settings.gemini_base_url, model or settings.gemini_model
+
+
+_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+    ".gif": "image/gif",
+    ".bmp": "image/bmp",
+}
+
+
+def _bytes_to_data_url(data: bytes, mime_type: str) -> str:
+    """Encode raw image bytes as a base64 data URL."""
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode()}"
+
+
+# EXIF orientations that rotate by 90°/270° (width and height swap)
+_TRANSPOSED_ORIENTATIONS = frozenset({5, 6, 7, 8})
+
+
+def _exif_orientation(img: Image.Image) -> int:
+    """EXIF orientation tag of *img* (1 = upright, also when absent)."""
+    return img.getexif().get(ExifTags.Base.Orientation, 1)
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Convert to RGB for JPEG, flattening any transparency onto white."""
+    if img.mode == "RGB":
+        return img
+    if img.mode == "P" and "transparency" in img.info:
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA"):
+        background = Image.new("RGB", img.size, "white")
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _image_to_data_url(image_path: str, max_side: int = 0) -> str:
+    """Encode image as base64 data URL for OpenAI vision API.
+
+    If *max_side* is set and the image's longer side exceeds it, a
+    downscaled JPEG is sent instead of the original bytes.  Bboxes come
+    back normalized to 0-1000, so they still map onto the original size.
+
+    Images with an EXIF orientation are re-encoded upright, so the model
+    sees the same pixel frame as cv2.imread (which applies the rotation)
+    and the refiner/annotator that work on it.
+    """
+    with Image.open(image_path) as img:
+        oversized = max_side > 0 and max(img.size) > max_side
+        if oversized or _exif_orientation(img) != 1:
+            if oversized:
+                # JPEG sources decode straight at a reduced DCT scale (still
+                # >= max_side); no-op for other formats.
+                img.draft("RGB", (max_side, max_side))
+            img = _to_rgb(ImageOps.exif_transpose(img))
+            if oversized:
+                img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+            buf = io.BytesIO()
+            img.save(buf, format="JPEG", quality=85, optimize=True)
+            return _bytes_to_data_url(buf.getvalue(), "image/jpeg")
+
+    mime_type = _MIME_TYPES.get(Path(image_path).suffix.lower(), "image/jpeg")
     with open(image_path, "rb") as f:
-        b64 = base64.b64encode(f.read()).decode()
+        return _bytes_to_data_url(f.read(), mime_type)
+
+
+# HTTP statuses that will fail the same way on every attempt (bad request,
+# auth, unknown model, unprocessable input) — no point backing off.
+_NON_RETRYABLE_STATUS = frozenset({400, 401, 403, 404, 422})
+
+
+# Upper bound on a server-requested Retry-After wait, so a bogus header cannot
+# stall a page (and its API semaphore slot) indefinitely.
+_MAX_RETRY_AFTER_SECONDS = 60.0
+
+
+def _is_retryable(exc: Exception) -> bool:
+    """False for API errors whose HTTP status marks them as permanent."""
+    return getattr(exc, "status_code", None) not in _NON_RETRYABLE_STATUS
+
 
-    return f"data:{mime_type};base64,{b64}"
+def _retry_after_seconds(exc: Exception) -> float | None:
+    """Seconds from the error response's Retry-After header (capped), if any."""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        seconds = float(value) if value is not None else None
+    except ValueError:
+        return None
+    if seconds is None or math.isnan(seconds):
+        return None
+    return min(max(seconds, 0.0), _MAX_RETRY_AFTER_SECONDS)
 
 
 async def _call_api_with_retry(
@@ -176,33 +387,41 @@ async def _call_api_with_retry(
     settings = get_settings()
     client, effective_model = _resolve_client_and_model(model, provider_config)
 
-    data_url = _image_to_data_url(image_path)
+    # File read + base64 of a multi-MB scan would block the event loop.
+    data_url = await asyncio.to_thread(
+        _image_to_data_url, image_path, settings.gemini_max_image_side,
+    )
+
+    # Built once and reused by every retry attempt.
+    messages = [
+        _SYSTEM_MESSAGE,
+        {
+            "role": "user",
+            "content": [
+                {"type": "image_url", "image_url": {"url": data_url}},
+                _USER_TEXT_PART,
+            ],
+        },
+    ]
 
     last_error: Exception | None = None
     for attempt in range(settings.gemini_max_retries):
         try:
-            response = await client.chat.completions.create(  # type: ignore[attr-defined]
-                model=effective_model,
-                messages=[
-                    {"role": "system", "content": _SYSTEM_PROMPT},
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "image_url", "image_url": {"url": data_url}},
-                            {"type": "text", "text": _USER_PROMPT},
-                        ],
-                    },
-                ],
-                temperature=settings.gemini_temperature,
-                response_format={"type": "json_object"},
-            )
+            async with _get_api_semaphore():
+                await _wait_for_rate_limit()
+                response = await client.chat.completions.create(  # type: ignore[attr-defined]
+                    model=effective_model,
+                    messages=messages,
+                    temperature=settings.gemini_temperature,
+                    response_format=_RESPONSE_FORMAT,
+                )
 
             content = response.choices[0].message.content
             if not content:
                 logger.warning("API returned empty content (attempt %d)", attempt + 1)
                 return []
 
-            parsed = json.loads(content)
+            parsed = orjson.loads(content)
             # Handle both {"words": [...]} and direct [...] formats
             if isinstance(parsed, list):
                 return parsed
@@ -216,8 +435,18 @@ async def _call_api_with_retry(
 
         except Exception as e:
             last_error = e
+            # A model that emitted invalid JSON is not retried
+            if isinstance(e, orjson.JSONDecodeError):
+                logger.error("API returned malformed JSON: %s", str(e))
+                raise RuntimeError("OCR API returned malformed JSON") from e
+            if not _is_retryable(e):
+                logger.error("API rejected the request: %s", str(e))
+                raise RuntimeError("OCR API rejected the request") from e
             if attempt < settings.gemini_max_retries - 1:
-                delay = settings.gemini_retry_delay * (2 ** attempt)
+                # Jittered so pages that failed together do not retry in
+                # lockstep; a server-provided Retry-After wins if longer.
+                delay = settings.gemini_retry_delay * (2 ** attempt) * random.uniform(0.5, 1.5)
+                delay = max(delay, _retry_after_seconds(e) or 0.0)
                 logger.warning(
                     "API error (attempt %d/%d): %s. Retrying in %.1fs...",
                     attempt + 1,
@@ -260,9 +489,22 @@ async def run_ocr(
     if not path.exists():
         raise FileNotFoundError(f"Image not found: {image_path}")
 
-    # Get image dimensions for bbox conversion
+    cache_key = _ocr_cache_key(
+        await asyncio.to_thread(_file_sha256, path), model, provider_config,
+    )
+    cached = _ocr_cache.get(cache_key)
+    if cached is not None:
+        _ocr_cache.move_to_end(cache_key)
+        logger.info("OCR cache hit for %s", image_path)
+        raw_text, cached_words = cached
+        return OcrResult(raw_text=raw_text, words=list(cached_words))
+
+    # Image dimensions for bbox conversion, in the upright (EXIF-applied)
+    # frame that _image_to_data_url sends and cv2.imread decodes
     with Image.open(path) as img:
         img_width, img_height = img.size
+        if _exif_orientation(img) in _TRANSPOSED_ORIENTATIONS:
+            img_width, img_height = img_height, img_width
 
     # Call API
     raw_words = await _call_api_with_retry(
@@ -286,4 +528,12 @@ async def run_ocr(
         words.append(OcrWord(text=text, bbox=bbox, confidence=confidence))
 
     raw_text = " ".join(w.text for w in words)
-    return OcrResult(raw_text=raw_text, words=words)
+    result = OcrResult(raw_text=raw_text, words=words)
+
+    # Empty results are not cached so a later retry can still succeed.
+    if words:
+        _ocr_cache[cache_key] = (raw_text, tuple(words))
+        if len(_ocr_cache) > _OCR_CACHE_MAX_ENTRIES:
+            _ocr_cache.popitem(last=False)
+
+    return result
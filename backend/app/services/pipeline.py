@@ -11,13 +11,16 @@ so the frontend can poll progress.
 """
 
 import asyncio
-import json
+import functools
 import logging
+import os
 import uuid
-from dataclasses import asdict
+from concurrent.futures import ThreadPoolExecutor
 
-from sqlalchemy import select
+import orjson
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.config import get_settings
 from app.models.comparison_task import ComparisonTask, TaskStatus
@@ -32,6 +35,14 @@ from app.services.preprocessing import preprocess_for_ocr
 logger = logging.getLogger("handwrite_diff.pipeline")
 
 
+# CPU-bound OpenCV work (preprocessing, bbox refinement, rendering) gets its own pool so
+# concurrent pages don't starve the default pool used for blocking I/O.
+# OpenCV releases the GIL, so threads already run on separate cores.
+_cpu_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="pipeline-cpu",
+)
+
+
 class ProcessingPipeline:
     """Orchestrates the full OCR → concatenated Diff → Annotate pipeline."""
 
@@ -54,7 +65,7 @@ class ProcessingPipeline:
             return
 
         ref_words = (
-            json.loads(task.reference_words)
+            orjson.loads(task.reference_words)
             if task.reference_words
             else normalize_word_list(task.reference_text)
         )
@@ -74,16 +85,45 @@ class ProcessingPipeline:
                     model=provider.default_model,
                 )
 
-        # Phase 1: OCR each image
+        # Phase 1: OCR each image.  Pages are OCR'd concurrently; API requests
+        # are bounded by ocr_service's process-wide semaphore and local OpenCV
+        # work by _cpu_executor.  Every DB write stays on this coroutine,
+        # since the session must not be shared between concurrent tasks.
         ocr_model = task.ocr_model
+        records: list[ImageRecord] = []
         for image_id in image_ids:
+            record = await self._db.get(ImageRecord, image_id)
+            if record:
+                record.status = ImageStatus.OCR_PROCESSING
+                records.append(record)
+        await self._db.commit()
+
+        async def _ocr_one(
+            record: ImageRecord,
+        ) -> tuple[ImageRecord, tuple[OcrResult, list[dict]] | Exception]:
             try:
-                await self._run_ocr_only(image_id, model=ocr_model, provider_config=provider_config)
+                return record, await self._run_ocr_only(
+                    record.image_path, model=ocr_model, provider_config=provider_config,
+                )
+            except Exception as exc:
+                return record, exc
+
+        for next_done in asyncio.as_completed([_ocr_one(r) for r in records]):
+            record, outcome = await next_done
+            try:
+                if isinstance(outcome, Exception):
+                    raise outcome
+                ocr_result, ocr_words_data = outcome
+                record.ocr_raw_text = ocr_result.raw_text
+                record.ocr_words_json = orjson.dumps(
+                    ocr_words_data, option=orjson.OPT_SERIALIZE_NUMPY,
+                ).decode()
+                record.status = ImageStatus.OCR_DONE
                 task.completed_images += 1
                 await self._db.commit()
             except Exception:
-                logger.exception("Failed OCR for image %d", image_id)
-                await self._mark_image_failed(image_id, "OCR pipeline error")
+                logger.exception("Failed OCR for image %d", record.id)
+                await self._mark_image_failed(record.id, "OCR pipeline error")
 
         # Phase 2: Concatenated diff + annotate (task-level)
         try:
@@ -117,7 +157,7 @@ class ProcessingPipeline:
             return
 
         ref_words = (
-            json.loads(task.reference_words)
+            orjson.loads(task.reference_words)
             if task.reference_words
             else normalize_word_list(task.reference_text)
         )
@@ -136,33 +176,41 @@ class ProcessingPipeline:
 
     async def _run_ocr_only(
         self,
-        image_id: int,
+        image_path: str,
         model: str | None = None,
         provider_config: ProviderConfig | None = None,
-    ) -> None:
-        """Run OCR on a single image and store results."""
-        record = await self._db.get(ImageRecord, image_id)
-        if not record:
-            return
+    ) -> tuple[OcrResult, list[dict]]:
+        """Run OCR on a single image; return the result and refined word dicts.
 
-        record.status = ImageStatus.OCR_PROCESSING
-        await self._db.commit()
-
-        # Step 0: preprocess into a temp file — original is never touched
-        ocr_path = await asyncio.to_thread(preprocess_for_ocr, record.image_path)
+        Touches no DB state, so several pages can run concurrently.
+        """
+        # Step 0: preprocess into a temp file (unless disabled) — original is never touched
+        loop = asyncio.get_running_loop()
+        settings = get_settings()
+        if settings.preprocess_enabled:
+            ocr_path, ocr_image = await loop.run_in_executor(
+                _cpu_executor,
+                functools.partial(preprocess_for_ocr, image_path,
+                                  skip_if_straight=settings.preprocess_skip_straight),
+            )
+        else:
+            ocr_path, ocr_image = image_path, None
         try:
             ocr_result: OcrResult = await run_ocr(
                 ocr_path, model=model, provider_config=provider_config
             )
 
-            # Refine bboxes on the preprocessed image (same pixel space)
-            refined_words = await asyncio.to_thread(refine_word_bboxes, ocr_path, ocr_result.words)
+            # Refine bboxes on the preprocessed image (same pixel space),
+            # reusing its decoded pixels when preprocessing succeeded
+            refined_words = await loop.run_in_executor(
+                _cpu_executor, refine_word_bboxes,
+                ocr_path if ocr_image is None else ocr_image, ocr_result.words,
+            )
         finally:
             # Always clean up the temp file; silently ignore missing-file errors
-            if ocr_path != record.image_path:
+            if ocr_path != image_path:
                 try:
-                    import os as _os
-                    _os.unlink(ocr_path)
+                    os.unlink(ocr_path)
                 except OSError:
                     pass
 
@@ -170,10 +218,7 @@ class ProcessingPipeline:
             {"text": w.text, "bbox": list(w.bbox), "confidence": w.confidence}
             for w in refined_words
         ]
-        record.ocr_raw_text = ocr_result.raw_text
-        record.ocr_words_json = json.dumps(ocr_words_data)
-        record.status = ImageStatus.OCR_DONE
-        await self._db.commit()
+        return ocr_result, ocr_words_data
 
     # ------------------------------------------------------------------
     # Phase 2: Concatenated diff + annotate (task-level)
@@ -186,8 +231,10 @@ class ProcessingPipeline:
     ) -> None:
         """Concatenate all OCR words by sort_order, diff once, split back."""
         # Fetch all images that have successful OCR, sorted by sort_order
+        # (existing annotations are loaded alongside in one IN query)
         result = await self._db.execute(
             select(ImageRecord)
+            .options(selectinload(ImageRecord.annotations))
             .where(ImageRecord.task_id == task_id)
             .where(
                 ImageRecord.status.in_([
@@ -211,30 +258,33 @@ class ProcessingPipeline:
         image_slices: list[tuple[ImageRecord, list[dict], int, int]] = []
 
         for record in records:
-            ocr_words_data = json.loads(record.ocr_words_json) if record.ocr_words_json else []
-            word_texts = [w["text"] for w in ocr_words_data]
+            ocr_words_data = orjson.loads(record.ocr_words_json) if record.ocr_words_json else []
             start = len(concatenated_words)
-            concatenated_words.extend(word_texts)
+            concatenated_words.extend(w["text"] for w in ocr_words_data)
             end = len(concatenated_words)
             image_slices.append((record, ocr_words_data, start, end))
 
         # Single diff on full concatenated text
         all_diff_ops = compute_word_diff(concatenated_words, ref_words)
 
-        # Split diff ops back to each image and process
+        # Split diff ops back to each image and prepare its annotations.
+        # Nothing is written to the DB until every image has rendered, so a
+        # failed image needs no rollback and the write lock isn't held while
+        # images render.
+        diffed: list[tuple[ImageRecord, str, list[dict], list[DiffOp],
+                           dict[int | None, WordAnnotation], list[dict]]] = []
+        failed: list[ImageRecord] = []
+        prev_ocr, next_ocr = _nearest_ocr_indices(all_diff_ops)
         for record, ocr_words_data, start, end in image_slices:
             try:
-                image_ops = _split_diff_ops_for_image(all_diff_ops, start, end)
-
-                # ── Preserve user-corrected annotations ──
-                existing_q = await self._db.execute(
-                    select(WordAnnotation).where(WordAnnotation.image_id == record.id)
+                image_ops = _split_diff_ops_for_image(
+                    all_diff_ops, start, end, prev_ocr, next_ocr,
                 )
-                existing_annotations = existing_q.scalars().all()
 
+                # ── Preserve user-corrected annotations ──
                 # Collect user corrections keyed by word_index (ocr_index)
                 user_corrections: dict[int | None, WordAnnotation] = {}
-                for a in existing_annotations:
+                for a in record.annotations:
                     if a.is_user_corrected:
                         user_corrections[a.word_index] = a
 
@@ -251,18 +301,19 @@ class ProcessingPipeline:
                 if user_corrections:
                     image_ops = _apply_user_corrections(image_ops, user_corrections)
 
-                # Store per-image diff result (hidden members keep original ref_word
+                # Serialize per-image diff result (hidden members keep original ref_word
                 # so the frontend re-pairing pass can display orphaned refs correctly)
                 ops_serialized = []
                 for op in image_ops:
-                    d = asdict(op)
+                    d = op._asdict()
                     if op.ocr_index is not None and op.ocr_index < len(ocr_words_data):
                         d["ocr_confidence"] = ocr_words_data[op.ocr_index].get("confidence")
                     else:
                         d["ocr_confidence"] = None
                     ops_serialized.append(d)
-                record.diff_result_json = json.dumps(ops_serialized)
-                record.status = ImageStatus.DIFF_DONE
+                diff_result_json = orjson.dumps(
+                    ops_serialized, option=orjson.OPT_SERIALIZE_NUMPY,
+                ).decode()
 
                 # Apply merge re-pairing for annotation rendering: suppress hidden
                 # members and re-pair orphaned ref words with subsequent EXTRA ops,
@@ -274,14 +325,6 @@ class ProcessingPipeline:
                     else image_ops
                 )
 
-                # Delete old annotations
-                for a in existing_annotations:
-                    await self._db.delete(a)
-
-                # Create new annotations (using re-paired ops for accurate visual annotation)
-                self._create_annotations(record.id, ocr_words_data, annotate_ops,
-                                         user_corrections)
-
                 # Build ocr_words copy with merged bboxes for annotation rendering
                 annotate_ocr_words = list(ocr_words_data)
                 if user_corrections:
@@ -295,16 +338,67 @@ class ProcessingPipeline:
                                 "bbox": [uc.bbox_x1, uc.bbox_y1, uc.bbox_x2, uc.bbox_y2],
                             }
 
-                # Render annotated image (using re-paired ops)
-                await self._annotate_static_image(record, annotate_ocr_words, annotate_ops)
-                record.status = ImageStatus.ANNOTATED
-
-                await self._db.commit()  # 单次原子提交
+                diffed.append((record, diff_result_json, ocr_words_data,
+                               annotate_ops, user_corrections, annotate_ocr_words))
 
             except Exception:
                 logger.exception("Failed diff/annotate for image %d", record.id)
-                await self._db.rollback()
-                await self._mark_image_failed(record.id, "Diff/annotate pipeline error")
+                failed.append(record)
+
+        # Render annotated images (using re-paired ops) concurrently; the
+        # CPU executor bounds how many run at once.
+        rendered = await asyncio.gather(
+            *(self._annotate_static_image(record, annotate_ocr_words, annotate_ops)
+              for record, _, _, annotate_ops, _, annotate_ocr_words in diffed),
+            return_exceptions=True,
+        )
+        prepared: list[tuple[ImageRecord, str, str, list[dict], list[DiffOp],
+                             dict[int | None, WordAnnotation]]] = []
+        for (record, diff_result_json, ocr_words_data, annotate_ops,
+             user_corrections, _), annotated_path in zip(diffed, rendered):
+            if isinstance(annotated_path, Exception):
+                logger.error(
+                    "Failed diff/annotate for image %d", record.id,
+                    exc_info=annotated_path,
+                )
+                failed.append(record)
+            else:
+                prepared.append((record, diff_result_json, annotated_path,
+                                 ocr_words_data, annotate_ops, user_corrections))
+
+        # Write every image's results and commit once for the whole task.
+        # Old annotations go in one DELETE up front, so the record UPDATEs and
+        # annotation INSERTs below are flushed together as batched statements.
+        image_ids = [record.id for record in records]
+        try:
+            if prepared:
+                await self._db.execute(
+                    delete(WordAnnotation).where(
+                        WordAnnotation.image_id.in_([p[0].id for p in prepared])
+                    )
+                )
+
+            for (record, diff_result_json, annotated_path,
+                 ocr_words_data, annotate_ops, user_corrections) in prepared:
+                record.diff_result_json = diff_result_json
+                record.annotated_image_path = annotated_path
+                record.status = ImageStatus.ANNOTATED
+
+                # Create new annotations (using re-paired ops for accurate visual annotation)
+                self._create_annotations(record.id, ocr_words_data, annotate_ops,
+                                         user_corrections)
+
+            for record in failed:
+                record.status = ImageStatus.FAILED
+                record.error_message = "Diff/annotate pipeline error"
+
+            await self._db.commit()
+
+        except Exception:
+            logger.exception("Failed to save diff/annotate results for task %d", task_id)
+            await self._db.rollback()
+            for image_id in image_ids:
+                await self._mark_image_failed(image_id, "Diff/annotate pipeline error")
 
     # ------------------------------------------------------------------
     # Shared helpers
@@ -326,7 +420,7 @@ class ProcessingPipeline:
         if user_corrections is None:
             user_corrections = {}
 
-        for op in diff_ops:
+        for op_idx, op in enumerate(diff_ops):
             if op.diff_type == DiffType.CORRECT:
                 # Still create annotation for user-corrected "correct" entries
                 # so the correction flag is preserved
@@ -342,7 +436,7 @@ class ProcessingPipeline:
                 b = ocr_words_data[op.ocr_index]["bbox"]
                 bbox = (b[0], b[1], b[2], b[3])
             elif op.diff_type == DiffType.MISSING:
-                bbox = _infer_missing_bbox(ocr_words_data, diff_ops, op)
+                bbox = _infer_missing_bbox(ocr_words_data, diff_ops, op_idx)
 
             # Map diff type to annotation shape
             shape_map = {
@@ -379,22 +473,25 @@ class ProcessingPipeline:
         record: ImageRecord,
         ocr_words_data: list[dict],
         diff_ops: list[DiffOp],
-    ) -> None:
-        """Render annotations onto original image and save."""
+    ) -> str:
+        """Render annotations onto original image and save; return the output path."""
         settings = get_settings()
         settings.ensure_storage_dirs()
 
         output_name = f"{record.task_id}_{record.id}_{uuid.uuid4().hex[:8]}.jpg"
         output_path = str(settings.annotated_dir / output_name)
 
-        await asyncio.to_thread(
-            annotate_image,
-            image_path=record.image_path,
-            ocr_words=ocr_words_data,
-            diff_ops=diff_ops,
-            output_path=output_path,
+        await asyncio.get_running_loop().run_in_executor(
+            _cpu_executor,
+            functools.partial(
+                annotate_image,
+                image_path=record.image_path,
+                ocr_words=ocr_words_data,
+                diff_ops=diff_ops,
+                output_path=output_path,
+            ),
         )
-        record.annotated_image_path = output_path
+        return output_path
 
     async def _mark_image_failed(self, image_id: int, message: str) -> None:
         """Mark an image as failed with error message."""
@@ -412,9 +509,9 @@ class ProcessingPipeline:
 def _infer_missing_bbox(
     ocr_words_data: list[dict],
     diff_ops: list[DiffOp],
-    target_op: DiffOp,
+    op_idx: int,
 ) -> tuple[float, float, float, float]:
-    """Infer a plausible bbox for a MISSING word from its neighbouring OCR words.
+    """Infer a plausible bbox for the MISSING word at ``diff_ops[op_idx]``.
 
     Strategy:
       - Find the nearest preceding and following ops that have an ``ocr_index``
@@ -432,15 +529,6 @@ def _infer_missing_bbox(
     if not ocr_words_data:
         return (0.0, 0.0, 0.0, 0.0)
 
-    # Locate target_op inside diff_ops
-    op_idx: int | None = None
-    for i, o in enumerate(diff_ops):
-        if o is target_op:
-            op_idx = i
-            break
-    if op_idx is None:
-        return (0.0, 0.0, 0.0, 0.0)
-
     # Find previous and next OCR-backed neighbours
     prev_bbox: tuple[float, float, float, float] | None = None
     next_bbox: tuple[float, float, float, float] | None = None
@@ -658,10 +746,39 @@ def _apply_merge_repairing(
 # Module-level helper: split global DiffOps into per-image local ops
 # ------------------------------------------------------------------
 
+def _nearest_ocr_indices(
+    all_ops: list[DiffOp],
+) -> tuple[list[int | None], list[int | None]]:
+    """For each op, the ocr_index of the nearest preceding / following op that has one.
+
+    Computed once per task so that ``_split_diff_ops_for_image`` can place
+    every MISSING op in O(1) instead of scanning ``all_ops`` per image.
+    """
+    n = len(all_ops)
+    prev_ocr: list[int | None] = [None] * n
+    next_ocr: list[int | None] = [None] * n
+
+    cur: int | None = None
+    for i, op in enumerate(all_ops):
+        prev_ocr[i] = cur
+        if op.ocr_index is not None:
+            cur = op.ocr_index
+
+    cur = None
+    for i in range(n - 1, -1, -1):
+        next_ocr[i] = cur
+        if all_ops[i].ocr_index is not None:
+            cur = all_ops[i].ocr_index
+
+    return prev_ocr, next_ocr
+
+
 def _split_diff_ops_for_image(
     all_ops: list[DiffOp],
     start: int,
     end: int,
+    prev_ocr: list[int | None],
+    next_ocr: list[int | None],
 ) -> list[DiffOp]:
     """Extract and re-index DiffOps belonging to one image's OCR word range.
 
@@ -669,6 +786,8 @@ def _split_diff_ops_for_image(
         all_ops: Full list of DiffOps from the concatenated diff.
         start: Start offset (inclusive) of this image's words in the concatenated list.
         end: End offset (exclusive) of this image's words in the concatenated list.
+        prev_ocr: Nearest preceding ocr_index per op (see ``_nearest_ocr_indices``).
+        next_ocr: Nearest following ocr_index per op (see ``_nearest_ocr_indices``).
 
     Returns:
         DiffOps with ocr_index mapped to local (0-based) indices.
@@ -696,42 +815,36 @@ def _split_diff_ops_for_image(
                 ))
         else:
             # MISSING — find nearest preceding op with an ocr_index
-            owner_start = _find_owner_start_for_missing(all_ops, i, start, end)
+            # (DiffOp is frozen and needs no remapping, so it is shared as-is)
+            owner_start = _find_owner_start_for_missing(prev_ocr[i], next_ocr[i], start, end)
             if owner_start is not None:
-                result.append(DiffOp(
-                    diff_type=op.diff_type,
-                    ocr_index=None,
-                    ref_index=op.ref_index,
-                    ocr_word=op.ocr_word,
-                    reference_word=op.reference_word,
-                ))
+                result.append(op)
 
     return result
 
 
 def _find_owner_start_for_missing(
-    all_ops: list[DiffOp],
-    missing_idx: int,
+    prev_ocr_index: int | None,
+    next_ocr_index: int | None,
     start: int,
     end: int,
 ) -> int | None:
-    """Determine if a MISSING op at `missing_idx` belongs to the image [start, end).
+    """Determine if a MISSING op belongs to the image [start, end).
 
-    Strategy: look backward for the nearest op with an ocr_index.
+    Strategy: use the nearest preceding op with an ocr_index.
     - If found and its ocr_index is in [start, end), this image owns the MISSING op.
     - If no predecessor has ocr_index (i.e., MISSING ops at the very beginning),
       assign to the first image (start == 0).
     - If predecessor's ocr_index is in a *later* image, the MISSING doesn't belong here.
 
-    Additionally, look forward: if the MISSING has no predecessor (leading MISSINGs)
-    and the next op with an ocr_index belongs to this image, claim it.
+    Additionally, if the MISSING has no predecessor (leading MISSINGs) and
+    *next_ocr_index* (the ocr_index of the nearest following op that has one)
+    falls in this image, claim it.
     """
-    # Look backward
-    for j in range(missing_idx - 1, -1, -1):
-        if all_ops[j].ocr_index is not None:
-            if start <= all_ops[j].ocr_index < end:
-                return start
-            return None
+    if prev_ocr_index is not None:
+        if start <= prev_ocr_index < end:
+            return start
+        return None
 
     # No predecessor with ocr_index — these are leading MISSINGs.
     # Assign to the first image (start == 0), or if the next op with
@@ -739,14 +852,6 @@ def _find_owner_start_for_missing(
     if start == 0:
         return start
 
-    # Look forward for context
-    for j in range(missing_idx + 1, len(all_ops)):
-        if all_ops[j].ocr_index is not None:
-            if start <= all_ops[j].ocr_index < end:
-                return start
-            return None
-
-    # All ops are MISSING with no ocr_index at all — assign to first image
-    if start == 0:
+    if next_ocr_index is not None and start <= next_ocr_index < end:
         return start
     return None
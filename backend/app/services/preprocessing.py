@@ -13,8 +13,16 @@ import numpy as np
 
 logger = logging.getLogger("handwrite_diff.preprocessing")
 
+# Longest side (px) of the copy used for skew-angle detection
+_DESKEW_MAX_SIDE = 1000
 
-def preprocess_for_ocr(image_path: str) -> str:
+# JPEG quality of the preprocessed temp file sent to OCR
+_TEMP_JPEG_QUALITY = 85
+
+
+def preprocess_for_ocr(
+    image_path: str, skip_if_straight: bool = False,
+) -> tuple[str, np.ndarray | None]:
     """Return a preprocessed copy of the image optimised for OCR.
 
     Applies deskew (Hough lines) and CLAHE contrast enhancement.
@@ -27,37 +35,50 @@ def preprocess_for_ocr(image_path: str) -> str:
 
     Args:
         image_path: Path to the original image (will not be modified).
+        skip_if_straight: When the page needs no deskew, skip CLAHE and the
+            temp file and return ``(image_path, original image)``.
 
     Returns:
-        Path to the preprocessed temp file, or ``image_path`` on failure.
+        ``(path, image)``: the preprocessed temp file and its decoded BGR
+        array, so later steps need not read the file back; or
+        ``(image_path, None)`` on failure.
     """
     try:
         img = cv2.imread(image_path)
         if img is None:
             logger.warning("preprocessing: cannot read %s", image_path)
-            return image_path
+            return image_path, None
 
         # ------------------------------------------------------------------
         # Step 1: Deskew via Hough lines
         # ------------------------------------------------------------------
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # The skew angle is scale-invariant, so detect it on a downscaled copy
+        # (vote threshold scaled to match) and rotate the full-res image.
+        h, w = img.shape[:2]
+        scale = min(1.0, _DESKEW_MAX_SIDE / max(h, w))
+        small = (
+            cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            if scale < 1.0
+            else img
+        )
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
         blurred = cv2.GaussianBlur(gray, (5, 5), 0)
         edges = cv2.Canny(blurred, 50, 150, apertureSize=3)
-        lines = cv2.HoughLines(edges, 1, np.pi / 180, threshold=100)
+        lines = cv2.HoughLines(
+            edges, 1, np.pi / 180, threshold=max(1, round(100 * scale)),
+        )
 
         angle = 0.0
         if lines is not None:
-            angles: list[float] = []
-            for line in lines[:50]:
-                theta = line[0][1]
-                a = (theta - np.pi / 2) * 180.0 / np.pi
-                if abs(a) < 45:
-                    angles.append(a)
-            if angles:
+            angles = np.degrees(lines[:50, 0, 1] - np.pi / 2)
+            angles = angles[np.abs(angles) < 45]
+            if angles.size:
                 angle = float(np.median(angles))
 
+        if abs(angle) <= 0.5 and skip_if_straight:
+            return image_path, img
+
         if abs(angle) > 0.5:
-            h, w = img.shape[:2]
             M = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
             img = cv2.warpAffine(
                 img, M, (w, h),
@@ -67,23 +88,22 @@ def preprocess_for_ocr(image_path: str) -> str:
             logger.info("Deskewed %.1f° for OCR → %s", angle, Path(image_path).name)
 
         # ------------------------------------------------------------------
-        # Step 2: CLAHE on LAB L-channel
+        # Step 2: CLAHE on the YUV luma channel
         # ------------------------------------------------------------------
-        lab = cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
-        l_ch, a_ch, b_ch = cv2.split(lab)
+        yuv = cv2.cvtColor(img, cv2.COLOR_BGR2YUV)
         clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-        l_ch = clahe.apply(l_ch)
-        img = cv2.cvtColor(cv2.merge([l_ch, a_ch, b_ch]), cv2.COLOR_LAB2BGR)
+        yuv[:, :, 0] = clahe.apply(yuv[:, :, 0])
+        img = cv2.cvtColor(yuv, cv2.COLOR_YUV2BGR)
 
-        # Write to a temp file in the same directory (avoids cross-device moves)
-        suffix = Path(image_path).suffix or ".jpg"
-        fd, tmp_path = tempfile.mkstemp(suffix=suffix, dir=Path(image_path).parent)
+        # Write to a temp file in the same directory (avoids cross-device moves).
+        # Always JPEG: a PNG original would otherwise pay for slow deflate.
+        fd, tmp_path = tempfile.mkstemp(suffix=".jpg", dir=Path(image_path).parent)
         import os
         os.close(fd)
-        cv2.imwrite(tmp_path, img)
+        cv2.imwrite(tmp_path, img, [cv2.IMWRITE_JPEG_QUALITY, _TEMP_JPEG_QUALITY])
         logger.debug("Preprocessed temp file: %s", tmp_path)
-        return tmp_path
+        return tmp_path, img
 
     except Exception:
         logger.exception("preprocessing failed for %s — using original", image_path)
-        return image_path
+        return image_path, None
@@ -1,6 +1,5 @@
 """Unit tests for the annotator service."""
 
-import tempfile
 from pathlib import Path
 
 import cv2
@@ -8,28 +7,33 @@ import numpy as np
 import pytest
 
 from app.services.annotator import (
+    COLOR_EXTRA,
+    COLOR_MISSING,
     AnnotationStyle,
     LabelRect,
     _rects_overlap,
     _resolve_label_overlaps,
     annotate_image,
+    annotate_image_array,
+    render_from_annotations,
 )
 from app.services.diff_engine import DiffOp, DiffType
 
 
-def _create_test_image(width: int = 800, height: int = 200) -> str:
-    """Create a temporary white image and return its path."""
-    img = np.ones((height, width, 3), dtype=np.uint8) * 255
-    tmp = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
-    cv2.imwrite(tmp.name, img)
-    return tmp.name
+def _create_test_image(tmp_path: Path, width: int = 800, height: int = 200) -> str:
+    """Write a white image into *tmp_path* and return its path."""
+    path = tmp_path / "in.png"
+    cv2.imwrite(str(path), _make_white(height, width))
+    return str(path)
+
+
+def _make_white(height: int = 200, width: int = 800) -> np.ndarray:
+    """Return a white BGR image array."""
+    return np.full((height, width, 3), 255, dtype=np.uint8)
 
 
 class TestAnnotateImage:
     def test_basic_wrong_annotation(self) -> None:
-        img_path = _create_test_image()
-        output_path = tempfile.mktemp(suffix=".jpg")
-
         ocr_words = [
             {"text": "the", "bbox": [10, 50, 60, 80], "confidence": 0.9},
             {"text": "set", "bbox": [70, 50, 120, 80], "confidence": 0.8},
@@ -39,21 +43,12 @@ class TestAnnotateImage:
             DiffOp(DiffType.WRONG, 1, 1, "set", "sat"),
         ]
 
-        result = annotate_image(img_path, ocr_words, diff_ops, output_path)
-        assert Path(result).exists()
+        annotated = annotate_image_array(_make_white(), ocr_words, diff_ops)
 
-        annotated = cv2.imread(result)
-        assert annotated is not None
-        assert annotated.shape[0] > 0
-
-        # Cleanup
-        Path(img_path).unlink(missing_ok=True)
-        Path(output_path).unlink(missing_ok=True)
+        assert annotated.shape == (200, 800, 3)
+        assert (annotated != 255).any()
 
     def test_extra_annotation(self) -> None:
-        img_path = _create_test_image()
-        output_path = tempfile.mktemp(suffix=".jpg")
-
         ocr_words = [
             {"text": "the", "bbox": [10, 50, 60, 80], "confidence": 0.9},
             {"text": "extra", "bbox": [70, 50, 150, 80], "confidence": 0.7},
@@ -63,16 +58,11 @@ class TestAnnotateImage:
             DiffOp(DiffType.EXTRA, 1, None, "extra", None),
         ]
 
-        result = annotate_image(img_path, ocr_words, diff_ops, output_path)
-        assert Path(result).exists()
+        annotated = annotate_image_array(_make_white(), ocr_words, diff_ops)
 
-        Path(img_path).unlink(missing_ok=True)
-        Path(output_path).unlink(missing_ok=True)
+        assert (annotated != 255).any()
 
     def test_missing_annotation(self) -> None:
-        img_path = _create_test_image()
-        output_path = tempfile.mktemp(suffix=".jpg")
-
         ocr_words = [
             {"text": "the", "bbox": [10, 50, 60, 80], "confidence": 0.9},
             {"text": "sat", "bbox": [150, 50, 210, 80], "confidence": 0.85},
@@ -83,49 +73,45 @@ class TestAnnotateImage:
             DiffOp(DiffType.CORRECT, 1, 2, "sat", "sat"),
         ]
 
-        result = annotate_image(img_path, ocr_words, diff_ops, output_path)
-        assert Path(result).exists()
+        annotated = annotate_image_array(_make_white(), ocr_words, diff_ops)
 
-        Path(img_path).unlink(missing_ok=True)
-        Path(output_path).unlink(missing_ok=True)
+        assert (annotated != 255).any()
 
     def test_no_diffs_produces_clean_image(self) -> None:
-        img_path = _create_test_image()
-        output_path = tempfile.mktemp(suffix=".jpg")
-
         ocr_words = [{"text": "hello", "bbox": [10, 50, 80, 80], "confidence": 0.95}]
         diff_ops = [DiffOp(DiffType.CORRECT, 0, 0, "hello", "hello")]
 
-        result = annotate_image(img_path, ocr_words, diff_ops, output_path)
-        assert Path(result).exists()
+        annotated = annotate_image_array(_make_white(), ocr_words, diff_ops)
+
+        assert (annotated == 255).all()
+
+    def test_file_wrapper_saves_output(self, tmp_path: Path) -> None:
+        img_path = _create_test_image(tmp_path)
+        output_path = str(tmp_path / "out.jpg")
 
-        Path(img_path).unlink(missing_ok=True)
-        Path(output_path).unlink(missing_ok=True)
+        ocr_words = [{"text": "set", "bbox": [10, 50, 60, 80], "confidence": 0.8}]
+        diff_ops = [DiffOp(DiffType.WRONG, 0, 0, "set", "sat")]
+
+        result = annotate_image(img_path, ocr_words, diff_ops, output_path)
+        assert result == output_path
+        assert cv2.imread(result).shape == (200, 800, 3)
 
-    def test_invalid_image_path_raises(self) -> None:
+    def test_invalid_image_path_raises(self, tmp_path: Path) -> None:
         with pytest.raises(FileNotFoundError):
-            annotate_image("/nonexistent.png", [], [], "/tmp/out.jpg")
+            annotate_image(str(tmp_path / "missing.png"), [], [], str(tmp_path / "out.jpg"))
 
     def test_custom_style(self) -> None:
-        img_path = _create_test_image()
-        output_path = tempfile.mktemp(suffix=".jpg")
-
         style = AnnotationStyle(ellipse_thickness=5, font_height_ratio=1.0)
         ocr_words = [{"text": "set", "bbox": [10, 50, 60, 80], "confidence": 0.8}]
         diff_ops = [DiffOp(DiffType.WRONG, 0, 0, "set", "sat")]
 
-        result = annotate_image(img_path, ocr_words, diff_ops, output_path, style=style)
-        assert Path(result).exists()
+        annotated = annotate_image_array(_make_white(), ocr_words, diff_ops, style=style)
 
-        Path(img_path).unlink(missing_ok=True)
-        Path(output_path).unlink(missing_ok=True)
+        assert (annotated != 255).any()
 
     def test_overlapping_wrong_labels_get_separated(self) -> None:
         """Two WRONG annotations at similar x positions should produce
         non-overlapping labels in the annotated image."""
-        img_path = _create_test_image(width=800, height=400)
-        output_path = tempfile.mktemp(suffix=".jpg")
-
         # Two words at very close x positions → labels will overlap without offset
         ocr_words = [
             {"text": "beg", "bbox": [100, 100, 160, 140], "confidence": 0.8},
@@ -136,16 +122,32 @@ class TestAnnotateImage:
             DiffOp(DiffType.WRONG, 1, 1, "sit", "sat"),
         ]
 
-        result = annotate_image(img_path, ocr_words, diff_ops, output_path)
-        assert Path(result).exists()
-
         # We can't easily pixel-check separation, but verify no crash
-        annotated = cv2.imread(result)
-        assert annotated is not None
-        assert annotated.shape[0] > 0
+        annotated = annotate_image_array(_make_white(400, 800), ocr_words, diff_ops)
+        assert annotated.shape == (400, 800, 3)
+
+
+class TestRenderFromAnnotations:
+    def test_strikethroughs_and_carets_are_drawn(self, tmp_path: Path) -> None:
+        img_path = _create_test_image(tmp_path)
+        output_path = str(tmp_path / "out.png")
+
+        annotations = [
+            {"error_type": "extra", "bbox_x1": 10, "bbox_y1": 50, "bbox_x2": 60, "bbox_y2": 80},
+            {"error_type": "extra", "bbox_x1": 300, "bbox_y1": 50, "bbox_x2": 360, "bbox_y2": 80},
+            {"error_type": "missing", "bbox_x1": 150, "bbox_y1": 50, "bbox_x2": 200, "bbox_y2": 80},
+            {"error_type": "missing", "bbox_x1": 500, "bbox_y1": 50, "bbox_x2": 550, "bbox_y2": 80},
+        ]
+
+        result = render_from_annotations(img_path, annotations, 1.0, output_path)
+        rendered = cv2.imread(result)
 
-        Path(img_path).unlink(missing_ok=True)
-        Path(output_path).unlink(missing_ok=True)
+        # Strikethrough rows through each EXTRA bbox centre are orange.
+        assert (rendered[65, 20:50] == COLOR_EXTRA).all(axis=1).any()
+        assert (rendered[65, 310:350] == COLOR_EXTRA).all(axis=1).any()
+        # Caret strokes under each MISSING bbox are blue.
+        assert (rendered[70:81, 170:181] == COLOR_MISSING).all(axis=2).any()
+        assert (rendered[70:81, 520:531] == COLOR_MISSING).all(axis=2).any()
 
 
 class TestRectsOverlap:
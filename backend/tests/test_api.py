@@ -1,21 +1,24 @@
 """Integration tests for the API endpoints."""
 
-import io
-import tempfile
-from pathlib import Path
+import json
 
+import cv2
+import numpy as np
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
-from PIL import Image
 
-from app.database import Base, engine
+from app.database import Base, async_session_factory, engine
 from app.main import app
+from app.models.image_record import ImageRecord
 
+# All tests share the module's event loop with the client and schema fixtures
+pytestmark = pytest.mark.asyncio(loop_scope="module")
 
-@pytest_asyncio.fixture(autouse=True)
-async def setup_db():
-    """Create tables before each test, drop after."""
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def schema():
+    """Create tables once for this module, drop them afterwards."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
@@ -23,29 +26,41 @@ async def setup_db():
         await conn.run_sync(Base.metadata.drop_all)
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(autouse=True, loop_scope="module")
+async def setup_db(schema):
+    """Empty every table before each test (cheaper than re-creating the schema)."""
+    async with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            await conn.execute(table.delete())
+    yield
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
 async def client():
+    """One client for the module; ASGITransport keeps no state between requests."""
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
 
 
 def _make_test_image() -> bytes:
-    """Create a small PNG image in memory."""
-    img = Image.new("RGB", (100, 50), color="white")
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
+    """Create a small white PNG image in memory."""
+    img = np.full((50, 100, 3), 255, dtype=np.uint8)
+    ok, buf = cv2.imencode(".png", img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    assert ok
+    return buf.tobytes()
+
+
+# Encoded once; every upload test sends these same bytes
+_TEST_PNG = _make_test_image()
 
 
-@pytest.mark.asyncio
 async def test_health(client: AsyncClient) -> None:
     resp = await client.get("/health")
     assert resp.status_code == 200
     assert resp.json()["status"] == "healthy"
 
 
-@pytest.mark.asyncio
 async def test_create_and_get_task(client: AsyncClient) -> None:
     resp = await client.post("/api/v1/tasks", json={
         "title": "Test Task",
@@ -62,7 +77,6 @@ async def test_create_and_get_task(client: AsyncClient) -> None:
     assert resp.json()["reference_words"] == ["The", "cat", "sat", "on", "the", "mat"]
 
 
-@pytest.mark.asyncio
 async def test_list_tasks(client: AsyncClient) -> None:
     await client.post("/api/v1/tasks", json={"title": "A", "reference_text": "word"})
     await client.post("/api/v1/tasks", json={"title": "B", "reference_text": "word"})
@@ -74,7 +88,6 @@ async def test_list_tasks(client: AsyncClient) -> None:
     assert len(data["items"]) == 2
 
 
-@pytest.mark.asyncio
 async def test_delete_task(client: AsyncClient) -> None:
     resp = await client.post("/api/v1/tasks", json={"title": "X", "reference_text": "y"})
     task_id = resp.json()["id"]
@@ -86,7 +99,6 @@ async def test_delete_task(client: AsyncClient) -> None:
     assert resp.status_code == 404
 
 
-@pytest.mark.asyncio
 async def test_upload_images(client: AsyncClient) -> None:
     resp = await client.post("/api/v1/tasks", json={
         "title": "Upload Test",
@@ -94,7 +106,7 @@ async def test_upload_images(client: AsyncClient) -> None:
     })
     task_id = resp.json()["id"]
 
-    img_bytes = _make_test_image()
+    img_bytes = _TEST_PNG
     resp = await client.post(
         f"/api/v1/tasks/{task_id}/images",
         files=[
@@ -108,7 +120,6 @@ async def test_upload_images(client: AsyncClient) -> None:
     assert len(data["images"]) == 2
 
 
-@pytest.mark.asyncio
 async def test_list_task_images(client: AsyncClient) -> None:
     resp = await client.post("/api/v1/tasks", json={
         "title": "List Images",
@@ -116,7 +127,7 @@ async def test_list_task_images(client: AsyncClient) -> None:
     })
     task_id = resp.json()["id"]
 
-    img_bytes = _make_test_image()
+    img_bytes = _TEST_PNG
     await client.post(
         f"/api/v1/tasks/{task_id}/images",
         files=[("files", ("img.png", img_bytes, "image/png"))],
@@ -127,7 +138,23 @@ async def test_list_task_images(client: AsyncClient) -> None:
     assert len(resp.json()) == 1
 
 
-@pytest.mark.asyncio
+async def test_task_stats_counts_diff_types(client: AsyncClient) -> None:
+    resp = await client.post("/api/v1/tasks", json={"title": "Stats", "reference_text": "a b c"})
+    task_id = resp.json()["id"]
+    ops = [{"diff_type": t} for t in ("correct", "correct", "wrong", "missing", "extra")]
+    async with async_session_factory() as db:
+        db.add(ImageRecord(task_id=task_id, image_path="p.png", diff_result_json=json.dumps(ops)))
+        db.add(ImageRecord(task_id=task_id, image_path="q.png"))  # not diffed yet
+        await db.commit()
+
+    resp = await client.get(f"/api/v1/tasks/{task_id}/stats")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["correct"], data["wrong"], data["missing"], data["extra"]) == (2, 1, 1, 1)
+    assert data["total_words"] == 5
+    assert data["accuracy_pct"] == 40.0
+
+
 async def test_task_not_found(client: AsyncClient) -> None:
     resp = await client.get("/api/v1/tasks/9999")
     assert resp.status_code == 404
@@ -0,0 +1,81 @@
+"""Unit tests for the bbox refiner service."""
+
+import cv2
+import numpy as np
+
+from app.services.bbox_refiner import refine_word_bboxes
+from app.services.ocr_service import OcrWord
+
+
+def _create_ink_image(tmp_path, boxes: list[tuple[int, int, int, int]]) -> str:
+    """Write a white image with a solid black rectangle per box."""
+    img = np.full((400, 1200, 3), 255, dtype=np.uint8)
+    for x1, y1, x2, y2 in boxes:
+        cv2.rectangle(img, (x1, y1), (x2, y2), (0, 0, 0), thickness=-1)
+    path = tmp_path / "ink.png"
+    cv2.imwrite(str(path), img)
+    return str(path)
+
+
+class TestRefineWordBboxes:
+    def test_shrinks_to_ink_extent(self, tmp_path) -> None:
+        img_path = _create_ink_image(tmp_path, [(110, 110, 150, 130)])
+        words = [OcrWord(text="cat", bbox=(100.0, 100.0, 160.0, 140.0), confidence=0.9)]
+
+        refined = refine_word_bboxes(img_path, words)
+
+        x1, y1, x2, y2 = refined[0].bbox
+        assert refined[0].text == "cat"
+        assert 100 <= x1 <= 112 and 100 <= y1 <= 112
+        assert 148 <= x2 <= 160 and 128 <= y2 <= 140
+
+    def test_blank_region_keeps_original(self, tmp_path) -> None:
+        img_path = _create_ink_image(tmp_path, [])
+        word = OcrWord(text="cat", bbox=(100.0, 100.0, 160.0, 140.0), confidence=0.9)
+
+        assert refine_word_bboxes(img_path, [word]) == [word]
+
+    def test_too_few_ink_pixels_keeps_original(self, tmp_path) -> None:
+        # Three isolated specks: below _MIN_INK_PIXELS, so not trusted as ink.
+        img_path = _create_ink_image(tmp_path, [(110, 110, 110, 110), (130, 120, 130, 120),
+                                                (150, 130, 150, 130)])
+        word = OcrWord(text="cat", bbox=(100.0, 100.0, 160.0, 140.0), confidence=0.9)
+
+        assert refine_word_bboxes(img_path, [word]) == [word]
+
+    def test_decoded_array_matches_path(self, tmp_path) -> None:
+        img_path = _create_ink_image(tmp_path, [(110, 110, 150, 130)])
+        words = [OcrWord(text="cat", bbox=(100.0, 100.0, 160.0, 140.0), confidence=0.9)]
+
+        assert refine_word_bboxes(cv2.imread(img_path), words) == refine_word_bboxes(img_path, words)
+
+    def test_unreadable_image_returns_input(self) -> None:
+        words = [OcrWord(text="cat", bbox=(0.0, 0.0, 10.0, 10.0), confidence=0.9)]
+        assert refine_word_bboxes("/nonexistent.png", words) is words
+
+    def test_many_words_preserve_order(self, tmp_path) -> None:
+        n = 101
+        boxes = [(20 + (i % 20) * 60, 20 + (i // 20) * 60, 50 + (i % 20) * 60, 50 + (i // 20) * 60)
+                 for i in range(n)]
+        img_path = _create_ink_image(tmp_path, boxes)
+        words = [
+            OcrWord(text=f"w{i}", bbox=(x1 - 5.0, y1 - 5.0, x2 + 5.0, y2 + 5.0), confidence=0.9)
+            for i, (x1, y1, x2, y2) in enumerate(boxes)
+        ]
+
+        refined = refine_word_bboxes(img_path, words)
+
+        assert [w.text for w in refined] == [w.text for w in words]
+        for word, (x1, y1, x2, y2) in zip(refined, boxes):
+            rx1, ry1, rx2, ry2 = word.bbox
+            assert abs(rx1 - x1) <= 2 and abs(ry1 - y1) <= 2
+            assert abs(rx2 - x2) <= 2 and abs(ry2 - y2) <= 2
+
+    def test_rewritten_image_is_reread(self, tmp_path) -> None:
+        word = OcrWord(text="cat", bbox=(100.0, 100.0, 160.0, 140.0), confidence=0.9)
+        img_path = _create_ink_image(tmp_path, [])
+        assert refine_word_bboxes(img_path, [word]) == [word]
+
+        # Same path, new content → the ink mask must be recomputed.
+        _create_ink_image(tmp_path, [(110, 110, 150, 130)])
+        assert refine_word_bboxes(img_path, [word])[0].bbox != word.bbox
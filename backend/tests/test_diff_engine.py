@@ -92,6 +92,13 @@ class TestComputeWordDiff:
         ops = compute_word_diff(ocr, ref)
         assert all(op.diff_type == DiffType.CORRECT for op in ops)
 
+    def test_exact_match_keeps_indices_and_strips_display(self) -> None:
+        ops = compute_word_diff(["Hello,", "world!"], ["hello", "World."])
+        assert [(op.ocr_index, op.ref_index, op.ocr_word, op.reference_word) for op in ops] == [
+            (0, 0, "Hello", "hello"),
+            (1, 1, "world", "World"),
+        ]
+
     def test_complex_scenario(self) -> None:
         """Test: OCR has errors, extras, and missing words."""
         ocr = ["The", "big", "cat", "set", "on", "the"]
@@ -114,6 +121,18 @@ class TestComputeWordDiff:
         assert ops[0].ocr_word == "Hello"
         assert ops[0].reference_word == "Hello"
 
+    def test_strips_unicode_edge_punctuation(self) -> None:
+        """Curly quotes / CJK brackets are trimmed like ASCII punctuation."""
+        ops = compute_word_diff(["“cat”", "「dog」"], ["cat", "dog"])
+        assert all(op.diff_type == DiffType.CORRECT for op in ops)
+        assert [op.ocr_word for op in ops] == ["cat", "dog"]
+
+    def test_all_punctuation_word_is_kept_for_display(self) -> None:
+        """Stripping '...' would leave nothing, so the original is kept."""
+        ops = compute_word_diff(["cat", "..."], ["cat"])
+        assert ops[1].diff_type == DiffType.EXTRA
+        assert ops[1].ocr_word == "..."
+
 
 class TestContractionHandling:
     """Tests for contraction equivalence post-processing."""
@@ -161,6 +180,17 @@ class TestContractionHandling:
         assert ops[0].ocr_word == "do not"
         assert ops[0].reference_word == "don't"
 
+    def test_merged_words_strip_only_outer_punctuation(self) -> None:
+        """The merged side is edge-stripped as a whole; inner punctuation stays."""
+        ops = compute_word_diff(["I'll", "go."], ['"I,', "will", "go."])
+        assert [(op.ocr_word, op.reference_word) for op in ops] == [
+            ("I'll", "I, will"),
+            ("go", "go"),
+        ]
+
+        ops = compute_word_diff(["(do,", 'not"', "go"], ["don't", "go"])
+        assert ops[0].ocr_word == "do, not"
+
     def test_contraction_in_context(self) -> None:
         """I'll go home ↔ I will go home → all CORRECT."""
         ocr = ["I'll", "go", "home"]
@@ -191,6 +221,14 @@ class TestContractionHandling:
         assert len(ops) == 1
         assert ops[0].diff_type == DiffType.WRONG
 
+    def test_long_ambiguous_run_does_not_blow_up(self) -> None:
+        """40 ambiguous contractions would be 2**40 expansions unpruned."""
+        ops = compute_word_diff(["it's"], ["he's"] * 40)
+        assert [op.diff_type for op in ops] == [DiffType.WRONG] + [DiffType.MISSING] * 39
+
+        ops = compute_word_diff(["he's"] * 40, ["it's"])
+        assert [op.diff_type for op in ops] == [DiffType.WRONG] + [DiffType.EXTRA] * 39
+
     # ------------------------------------------------------------------
     # P2b: na is EXTRA, subsequent OCR words match the ref contraction
     # ------------------------------------------------------------------
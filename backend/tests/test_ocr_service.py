@@ -0,0 +1,352 @@
+"""Unit tests for the OCR service (API calls are stubbed)."""
+
+import asyncio
+import base64
+import io
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+from PIL import ExifTags, Image
+
+from app.services import ocr_service
+from app.services.ocr_service import _image_to_data_url, run_ocr
+
+
+@pytest.fixture(autouse=True)
+def clear_ocr_cache():
+    ocr_service._ocr_cache.clear()
+    yield
+    ocr_service._ocr_cache.clear()
+
+
+@pytest.fixture
+def api_calls(monkeypatch) -> list[str]:
+    """Stub the API call; returns the list of image paths it was called with."""
+    calls: list[str] = []
+
+    async def fake_call(image_path, model=None, provider_config=None):
+        calls.append(image_path)
+        return [{"text": "cat", "box_2d": [100, 200, 300, 400], "confidence": 0.9}]
+
+    monkeypatch.setattr(ocr_service, "_call_api_with_retry", fake_call)
+    return calls
+
+
+def _write_image(path, value: int = 255, width: int = 100, height: int = 50) -> str:
+    """Write a plain page (white by default) of the given size."""
+    cv2.imwrite(str(path), np.full((height, width, 3), value, dtype=np.uint8))
+    return str(path)
+
+
+def _write_rotated_jpeg(path) -> str:
+    """200x100 stored pixels tagged "rotate 90° CW": 100x200 when displayed."""
+    exif = Image.Exif()
+    exif[ExifTags.Base.Orientation] = 6
+    Image.new("RGB", (200, 100), color="white").save(path, exif=exif)
+    return str(path)
+
+
+class TestOcrCache:
+    @pytest.mark.asyncio
+    async def test_identical_image_hits_cache(self, tmp_path, api_calls) -> None:
+        first = await run_ocr(_write_image(tmp_path / "a.png"), model="m")
+        second = await run_ocr(_write_image(tmp_path / "b.png"), model="m")
+
+        assert len(api_calls) == 1
+        assert second == first
+        assert first.words[0].bbox == (20.0, 5.0, 40.0, 15.0)
+
+    @pytest.mark.asyncio
+    async def test_mutating_a_result_does_not_corrupt_the_cache(self, tmp_path,
+                                                                 api_calls) -> None:
+        img_path = _write_image(tmp_path / "a.png")
+        first = await run_ocr(img_path, model="m")
+        first.words.clear()
+
+        second = await run_ocr(img_path, model="m")
+        second.words.reverse()
+
+        assert len(api_calls) == 1
+        assert [w.text for w in (await run_ocr(img_path, model="m")).words] == ["cat"]
+
+    @pytest.mark.asyncio
+    async def test_different_content_or_model_misses(self, tmp_path, api_calls) -> None:
+        await run_ocr(_write_image(tmp_path / "a.png"), model="m")
+        await run_ocr(_write_image(tmp_path / "b.png", value=0), model="m")
+        await run_ocr(_write_image(tmp_path / "a.png"), model="other")
+
+        assert len(api_calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_empty_result_is_not_cached(self, tmp_path, monkeypatch) -> None:
+        calls: list[str] = []
+
+        async def empty_call(image_path, model=None, provider_config=None):
+            calls.append(image_path)
+            return []
+
+        monkeypatch.setattr(ocr_service, "_call_api_with_retry", empty_call)
+        img_path = _write_image(tmp_path / "a.png")
+        await run_ocr(img_path, model="m")
+        await run_ocr(img_path, model="m")
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, tmp_path, api_calls, monkeypatch) -> None:
+        monkeypatch.setattr(ocr_service, "_OCR_CACHE_MAX_ENTRIES", 2)
+        img_path = _write_image(tmp_path / "a.png")
+        for model in ("m1", "m2", "m3"):
+            await run_ocr(img_path, model=model)
+
+        assert len(ocr_service._ocr_cache) == 2
+        await run_ocr(img_path, model="m1")  # evicted → API again
+        assert len(api_calls) == 4
+
+
+class TestExifOrientation:
+    @pytest.mark.asyncio
+    async def test_bboxes_use_the_frame_cv2_decodes(self, tmp_path, api_calls) -> None:
+        img_path = _write_rotated_jpeg(tmp_path / "phone.jpg")
+
+        result = await run_ocr(img_path, model="m")
+
+        # cv2.imread (refiner, annotator) applies the EXIF rotation
+        assert cv2.imread(img_path).shape[:2] == (200, 100)
+        assert result.words[0].bbox == (20.0, 20.0, 40.0, 60.0)
+
+
+class TestImageToDataUrl:
+    def _decode(self, data_url: str) -> Image.Image:
+        return Image.open(io.BytesIO(base64.b64decode(data_url.split(",", 1)[1])))
+
+    def test_small_image_sent_as_is(self, tmp_path) -> None:
+        img_path = _write_image(tmp_path / "a.png")
+        data_url = _image_to_data_url(img_path, max_side=1024)
+
+        assert data_url.startswith("data:image/png;base64,")
+        with open(img_path, "rb") as f:
+            assert base64.b64decode(data_url.split(",", 1)[1]) == f.read()
+
+    def test_large_image_downscaled_to_jpeg(self, tmp_path) -> None:
+        img_path = tmp_path / "big.png"
+        _write_image(img_path, width=3000, height=1500)
+        data_url = _image_to_data_url(str(img_path), max_side=1024)
+
+        assert data_url.startswith("data:image/jpeg;base64,")
+        assert self._decode(data_url).size == (1024, 512)
+
+    def test_zero_max_side_disables_downscale(self, tmp_path) -> None:
+        img_path = tmp_path / "big.png"
+        _write_image(img_path, width=3000, height=1500)
+
+        assert self._decode(_image_to_data_url(str(img_path), max_side=0)).size == (3000, 1500)
+
+    def test_large_jpeg_downscaled_to_max_side(self, tmp_path) -> None:
+        img_path = tmp_path / "big.jpg"
+        _write_image(img_path, width=4000, height=3000)
+
+        assert self._decode(_image_to_data_url(str(img_path), max_side=1024)).size == (1024, 768)
+
+    def test_large_rgba_png_flattened_onto_white(self, tmp_path) -> None:
+        img_path = tmp_path / "big.png"
+        Image.new("RGBA", (3000, 1500), color=(0, 0, 0, 0)).save(img_path)
+
+        decoded = self._decode(_image_to_data_url(str(img_path), max_side=1024))
+
+        assert decoded.mode == "RGB"
+        assert decoded.size == (1024, 512)
+        assert min(decoded.getpixel((512, 256))) > 250
+
+    def test_exif_rotated_jpeg_sent_upright(self, tmp_path) -> None:
+        img_path = _write_rotated_jpeg(tmp_path / "phone.jpg")
+
+        decoded = self._decode(_image_to_data_url(img_path, max_side=1024))
+
+        assert decoded.size == (100, 200)
+        assert decoded.getexif().get(ExifTags.Base.Orientation, 1) == 1
+
+
+class TestApiConcurrency:
+    @pytest.mark.asyncio
+    async def test_in_flight_requests_are_bounded(self, tmp_path, monkeypatch) -> None:
+        in_flight = 0
+        peak = 0
+
+        class FakeCompletions:
+            async def create(self, **kwargs):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                message = SimpleNamespace(content='{"words": []}')
+                return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+        monkeypatch.setattr(ocr_service, "_resolve_client_and_model", lambda m, p: (client, "m"))
+        monkeypatch.setattr(ocr_service, "_api_semaphore", asyncio.Semaphore(2))
+        img_path = _write_image(tmp_path / "a.png")
+
+        await asyncio.gather(*(ocr_service._call_api_with_retry(img_path) for _ in range(6)))
+
+        assert peak == 2
+
+
+class TestClientCache:
+    @pytest.fixture(autouse=True)
+    def isolated_client_cache(self, monkeypatch):
+        for var in ("ALL_PROXY", "all_proxy", "HTTP_PROXY", "http_proxy",
+                    "HTTPS_PROXY", "https_proxy"):
+            monkeypatch.delenv(var, raising=False)
+        monkeypatch.setattr(ocr_service, "_client_cache", OrderedDict())
+        monkeypatch.setattr(ocr_service, "_http_client_cache", {})
+
+    @pytest.mark.asyncio
+    async def test_same_endpoint_reuses_client(self) -> None:
+        client = ocr_service._get_client("http://a/v1", "k")
+        assert ocr_service._get_client("http://a/v1", "k") is client
+        await ocr_service.close_all_clients()
+
+    @pytest.mark.asyncio
+    async def test_same_origin_shares_connection_pool(self) -> None:
+        first = ocr_service._get_client("http://a/v1", "k1")
+        second = ocr_service._get_client("http://a/v1", "k2")
+        other = ocr_service._get_client("http://b/v1", "k1")
+
+        assert first is not second
+        assert first._client is second._client
+        assert other._client is not first._client
+        await ocr_service.close_all_clients()
+        assert first._client.is_closed and other._client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_client_is_evicted(self, monkeypatch) -> None:
+        monkeypatch.setattr(ocr_service, "_CLIENT_CACHE_MAX_ENTRIES", 2)
+        ocr_service._get_client("http://a/v1", "k")
+        ocr_service._get_client("http://b/v1", "k")
+        ocr_service._get_client("http://a/v1", "k")  # a is now most recent
+        ocr_service._get_client("http://c/v1", "k")
+
+        assert list(ocr_service._client_cache) == [("http://a/v1", "k"), ("http://c/v1", "k")]
+        await ocr_service.close_all_clients()
+        assert not ocr_service._client_cache
+
+
+class _StatusError(Exception):
+    """Stands in for openai.APIStatusError (status_code + response.headers)."""
+
+    def __init__(self, status_code: int, headers: dict | None = None) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class TestRetry:
+    @pytest.fixture
+    def failing_client(self, monkeypatch):
+        """Client whose create() raises the queued errors, then succeeds.
+
+        A queued ``str`` is returned as the reply content instead of raised.
+        """
+        errors: list[Exception] = []
+        calls: list[int] = []
+
+        class FakeCompletions:
+            async def create(self, **kwargs):
+                calls.append(1)
+                content = '{"words": [{"text": "cat"}]}'
+                if errors:
+                    queued = errors.pop(0)
+                    if not isinstance(queued, str):
+                        raise queued
+                    content = queued
+                message = SimpleNamespace(content=content)
+                return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+        client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions()))
+        monkeypatch.setattr(ocr_service, "_resolve_client_and_model", lambda m, p: (client, "m"))
+        settings = ocr_service.get_settings().model_copy(
+            update={"gemini_max_retries": 3, "gemini_retry_delay": 0.0},
+        )
+        monkeypatch.setattr(ocr_service, "get_settings", lambda: settings)
+        return errors, calls
+
+    @pytest.mark.asyncio
+    async def test_transient_error_is_retried(self, tmp_path, failing_client) -> None:
+        errors, calls = failing_client
+        errors.append(_StatusError(503))
+
+        words = await ocr_service._call_api_with_retry(_write_image(tmp_path / "a.png"))
+
+        assert words == [{"text": "cat"}]
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_permanent_error_fails_fast(self, tmp_path, failing_client) -> None:
+        errors, calls = failing_client
+        errors.append(_StatusError(401))
+
+        with pytest.raises(RuntimeError, match="rejected"):
+            await ocr_service._call_api_with_retry(_write_image(tmp_path / "a.png"))
+        assert len(calls) == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_after_header_sets_minimum_delay(self, tmp_path, failing_client,
+                                                         monkeypatch) -> None:
+        errors, _ = failing_client
+        errors.append(_StatusError(429, {"retry-after": "7"}))
+        delays: list[float] = []
+
+        async def fake_sleep(delay: float) -> None:
+            delays.append(delay)
+
+        monkeypatch.setattr(ocr_service.asyncio, "sleep", fake_sleep)
+        await ocr_service._call_api_with_retry(_write_image(tmp_path / "a.png"))
+
+        assert delays == [7.0]
+
+    @pytest.mark.asyncio
+    async def test_retry_after_header_is_capped(self, tmp_path, failing_client,
+                                                monkeypatch) -> None:
+        errors, _ = failing_client
+        errors.append(_StatusError(503, {"retry-after": "86400"}))
+        delays: list[float] = []
+
+        async def fake_sleep(delay: float) -> None:
+            delays.append(delay)
+
+        monkeypatch.setattr(ocr_service.asyncio, "sleep", fake_sleep)
+        await ocr_service._call_api_with_retry(_write_image(tmp_path / "a.png"))
+
+        assert delays == [ocr_service._MAX_RETRY_AFTER_SECONDS]
+
+    @pytest.mark.asyncio
+    async def test_malformed_json_fails_fast(self, tmp_path, failing_client) -> None:
+        replies, calls = failing_client
+        # The model "answers" with text that does not parse
+        replies.append("{not json")
+
+        with pytest.raises(RuntimeError, match="malformed JSON"):
+            await ocr_service._call_api_with_retry(_write_image(tmp_path / "a.png"))
+        assert len(calls) == 1
+
+
+class TestRateLimiter:
+    @pytest.mark.asyncio
+    async def test_request_starts_are_spaced(self) -> None:
+        limiter = ocr_service._RateLimiter(rps=50)
+        loop = asyncio.get_running_loop()
+        starts: list[float] = []
+
+        async def one() -> None:
+            await limiter.acquire()
+            starts.append(loop.time())
+
+        await asyncio.gather(*(one() for _ in range(5)))
+
+        gaps = [b - a for a, b in zip(starts, starts[1:])]
+        assert all(gap >= 0.015 for gap in gaps)
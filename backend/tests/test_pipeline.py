@@ -0,0 +1,177 @@
+"""Tests for the processing pipeline (OCR is stubbed)."""
+
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+
+from app.database import Base, async_session_factory, engine
+from app.models.comparison_task import ComparisonTask
+from app.models.image_record import ImageRecord, ImageStatus
+from app.models.word_annotation import WordAnnotation
+from app.services import pipeline as pipeline_module
+from app.services.diff_engine import DiffOp, DiffType
+from app.services.ocr_service import OcrResult
+from app.services.pipeline import (
+    ProcessingPipeline,
+    _infer_missing_bbox,
+    _nearest_ocr_indices,
+    _split_diff_ops_for_image,
+)
+
+
+@pytest_asyncio.fixture
+async def setup_db():
+    """Create tables for a DB-backed test, drop them after."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+async def _create_task(tmp_path, n_images: int) -> tuple[int, list[int]]:
+    async with async_session_factory() as db:
+        task = ComparisonTask(title="t", reference_text="hello world")
+        db.add(task)
+        await db.flush()
+        records = []
+        for i in range(n_images):
+            path = tmp_path / f"page{i}.png"
+            cv2.imwrite(str(path), np.full((100, 200, 3), 255, dtype=np.uint8))
+            records.append(ImageRecord(task_id=task.id, image_path=str(path), sort_order=i))
+        db.add_all(records)
+        await db.commit()
+        return task.id, [r.id for r in records]
+
+
+@pytest.mark.usefixtures("setup_db")
+class TestProcessTask:
+    @pytest.mark.asyncio
+    async def test_pages_are_ocred_concurrently(self, tmp_path, monkeypatch) -> None:
+        in_flight = 0
+        peak = 0
+
+        async def fake_ocr(self, image_path, model=None, provider_config=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            if image_path.endswith("page1.png"):
+                raise RuntimeError("OCR API failed")
+            words = [{"text": "hello", "bbox": [10.0, 10.0, 60.0, 30.0], "confidence": 0.9}]
+            return OcrResult(raw_text="hello", words=[]), words
+
+        monkeypatch.setattr(ProcessingPipeline, "_run_ocr_only", fake_ocr)
+        task_id, image_ids = await _create_task(tmp_path, 3)
+
+        async with async_session_factory() as db:
+            await ProcessingPipeline(db).process_task(task_id, image_ids)
+
+        async with async_session_factory() as db:
+            task = await db.get(ComparisonTask, task_id)
+            statuses = [(await db.get(ImageRecord, i)).status for i in image_ids]
+
+        assert peak > 1
+        assert task.completed_images == 2
+        assert statuses == [ImageStatus.ANNOTATED, ImageStatus.FAILED, ImageStatus.ANNOTATED]
+
+    @pytest.mark.asyncio
+    async def test_failed_render_marks_only_that_image(self, tmp_path, monkeypatch) -> None:
+        async def fake_ocr(self, image_path, model=None, provider_config=None):
+            words = [{"text": "hello", "bbox": [10.0, 10.0, 60.0, 30.0], "confidence": 0.9}]
+            return OcrResult(raw_text="hello", words=[]), words
+
+        real_annotate = pipeline_module.annotate_image
+
+        def flaky_annotate(*, image_path, **kwargs):
+            if image_path.endswith("page1.png"):
+                raise RuntimeError("render failed")
+            return real_annotate(image_path=image_path, **kwargs)
+
+        monkeypatch.setattr(ProcessingPipeline, "_run_ocr_only", fake_ocr)
+        monkeypatch.setattr(pipeline_module, "annotate_image", flaky_annotate)
+        task_id, image_ids = await _create_task(tmp_path, 3)
+
+        async with async_session_factory() as db:
+            await ProcessingPipeline(db).process_task(task_id, image_ids)
+
+        async with async_session_factory() as db:
+            records = [await db.get(ImageRecord, i) for i in image_ids]
+            n_annotations = len((await db.execute(select(WordAnnotation))).scalars().all())
+
+        assert [r.status for r in records] == [
+            ImageStatus.ANNOTATED, ImageStatus.FAILED, ImageStatus.ANNOTATED,
+        ]
+        assert records[1].annotated_image_path is None
+        assert records[0].diff_result_json and records[2].diff_result_json
+        assert n_annotations == 1  # page 2's EXTRA; the failed page wrote none
+
+
+@pytest.mark.usefixtures("setup_db")
+class TestRediffTask:
+    @pytest.mark.asyncio
+    async def test_rediff_replaces_annotations_and_keeps_user_corrections(
+        self, tmp_path, monkeypatch,
+    ) -> None:
+        async def fake_ocr(self, image_path, model=None, provider_config=None):
+            words = [{"text": "helo", "bbox": [10.0, 10.0, 60.0, 30.0], "confidence": 0.9}]
+            return OcrResult(raw_text="helo", words=[]), words
+
+        monkeypatch.setattr(ProcessingPipeline, "_run_ocr_only", fake_ocr)
+        task_id, image_ids = await _create_task(tmp_path, 1)
+        async with async_session_factory() as db:
+            await ProcessingPipeline(db).process_task(task_id, image_ids)
+
+        async with async_session_factory() as db:
+            annotations = (await db.execute(select(WordAnnotation))).scalars().all()
+            assert sorted(a.error_type.value for a in annotations) == ["missing", "wrong"]
+            wrong = next(a for a in annotations if a.error_type.value == "wrong")
+            wrong.is_user_corrected = True
+            await db.commit()
+
+        async with async_session_factory() as db:
+            await ProcessingPipeline(db).rediff_task(task_id)
+
+        async with async_session_factory() as db:
+            annotations = (await db.execute(select(WordAnnotation))).scalars().all()
+        assert len(annotations) == 2
+        assert [a.error_type.value for a in annotations if a.is_user_corrected] == ["wrong"]
+
+
+class TestSplitDiffOps:
+    def _split(self, ops: list[DiffOp], start: int, end: int) -> list[DiffOp]:
+        return _split_diff_ops_for_image(ops, start, end, *_nearest_ocr_indices(ops))
+
+    def test_missing_ops_follow_preceding_image(self) -> None:
+        ops = [
+            DiffOp(DiffType.MISSING, None, 0, None, "a"),
+            DiffOp(DiffType.CORRECT, 0, 1, "b", "b"),
+            DiffOp(DiffType.MISSING, None, 2, None, "c"),
+            DiffOp(DiffType.CORRECT, 1, 3, "d", "d"),
+        ]
+
+        first = self._split(ops, 0, 1)
+        second = self._split(ops, 1, 2)
+
+        assert [op.reference_word for op in first] == ["a", "b", "c"]
+        assert [(op.ocr_index, op.reference_word) for op in second] == [(0, "d")]
+
+
+class TestInferMissingBbox:
+    def test_missing_word_fills_gap_between_neighbours(self) -> None:
+        words = [
+            {"text": "a", "bbox": [10.0, 10.0, 40.0, 30.0]},
+            {"text": "c", "bbox": [80.0, 12.0, 120.0, 34.0]},
+        ]
+        ops = [
+            DiffOp(DiffType.CORRECT, 0, 0, "a", "a"),
+            DiffOp(DiffType.MISSING, None, 1, None, "b"),
+            DiffOp(DiffType.CORRECT, 1, 2, "c", "c"),
+        ]
+
+        assert _infer_missing_bbox(words, ops, 1) == (40.0, 10.0, 80.0, 34.0)
@@ -0,0 +1,57 @@
+"""Unit tests for OCR image preprocessing."""
+
+import os
+
+import cv2
+import numpy as np
+
+from app.services.preprocessing import preprocess_for_ocr
+
+
+def _create_lined_page(tmp_path, angle: float = 0.0) -> str:
+    """Write a white page of dark horizontal rules, rotated by *angle* degrees."""
+    img = np.full((800, 600, 3), 255, dtype=np.uint8)
+    for y in range(60, 760, 40):
+        cv2.line(img, (40, y), (560, y), (40, 40, 40), 2)
+    if angle:
+        m = cv2.getRotationMatrix2D((300, 400), angle, 1.0)
+        img = cv2.warpAffine(img, m, (600, 800), borderMode=cv2.BORDER_REPLICATE)
+    path = tmp_path / "page.png"
+    cv2.imwrite(str(path), img)
+    return str(path)
+
+
+class TestPreprocessForOcr:
+    def test_writes_jpeg_copy_and_keeps_original(self, tmp_path) -> None:
+        img_path = _create_lined_page(tmp_path, angle=3.0)
+        with open(img_path, "rb") as f:
+            original = f.read()
+
+        out_path, image = preprocess_for_ocr(img_path)
+
+        assert out_path != img_path and out_path.endswith(".jpg")
+        assert image is not None and image.shape == (800, 600, 3)
+        with open(img_path, "rb") as f:
+            assert f.read() == original
+        os.unlink(out_path)
+
+    def test_straight_page_skipped_when_requested(self, tmp_path) -> None:
+        img_path = _create_lined_page(tmp_path)
+
+        out_path, image = preprocess_for_ocr(img_path, skip_if_straight=True)
+
+        assert out_path == img_path
+        assert image is not None and image.shape == (800, 600, 3)
+
+    def test_skewed_page_still_processed_when_skipping_straight(self, tmp_path) -> None:
+        img_path = _create_lined_page(tmp_path, angle=3.0)
+
+        out_path, _ = preprocess_for_ocr(img_path, skip_if_straight=True)
+
+        assert out_path != img_path
+        os.unlink(out_path)
+
+    def test_unreadable_image_returns_original_path(self, tmp_path) -> None:
+        assert preprocess_for_ocr(str(tmp_path / "missing.png")) == (
+            str(tmp_path / "missing.png"), None,
+        )